@@ -16,6 +16,7 @@ from randovania.layout.permalink import Permalink
 from randovania.layout.starting_location import StartingLocation
 from randovania.layout.starting_resources import StartingResources
 from randovania.resolver import debug, generator, resolver
+from randovania.resolver.filler import retcon
 
 __all__ = ["create_subparsers"]
 
@@ -95,6 +96,7 @@ def add_validate_command(sub_parsers):
 
 def distribute_command_logic(args):
     debug._DEBUG_LEVEL = args.debug
+    retcon._WEIGHT_WORKERS = args.weight_workers
 
     def status_update(s):
         pass
@@ -144,6 +146,12 @@ def add_distribute_command(sub_parsers):
         type=int,
         default=None,
         help="The seed number to generate with.")
+    parser.add_argument(
+        "--weight-workers",
+        type=int,
+        default=0,
+        help="How many processes to use for checking the options of each step. "
+             "The result is the same for any value.")
     parser.set_defaults(func=distribute_command_logic)
 
 
@@ -3,7 +3,7 @@ import csv
 import json
 from argparse import ArgumentParser
 from pathlib import Path
-from typing import Dict, BinaryIO, Optional, TextIO
+from typing import Dict, BinaryIO, Optional, TextIO, Tuple
 
 from randovania import get_data_path
 from randovania.game_description import data_reader, data_writer
@@ -255,6 +255,45 @@ def list_paths_with_resource_command(sub_parsers):
     parser.set_defaults(func=list_paths_with_resource_logic)
 
 
+def _count_alternatives_per_area(game: GameDescription) -> Dict[Tuple[str, str], int]:
+    return {
+        (world.name, area.name): sum(len(requirements.alternatives)
+                                     for connection in area.connections.values()
+                                     for requirements in connection.values())
+        for world in game.world_list.worlds
+        for area in world.areas
+    }
+
+
+def minimize_requirements_logic(args):
+    data = decode_data_file(args)
+    before = _count_alternatives_per_area(data_reader.decode_data(data))
+    after = _count_alternatives_per_area(data_reader.decode_data(data, minimize_requirements=True))
+
+    for (world_name, area_name), count in before.items():
+        if args.show_all or count != after[world_name, area_name]:
+            print("{}/{}: {} -> {}".format(world_name, area_name, count, after[world_name, area_name]))
+
+    total_before = sum(before.values())
+    total_after = sum(after.values())
+    print("Total alternatives: {} -> {} ({} removed)".format(total_before, total_after, total_before - total_after))
+
+
+def minimize_requirements_command(sub_parsers):
+    parser = sub_parsers.add_parser(
+        "minimize-requirements",
+        help="Reports how many alternatives are removed in each area when loading with minimized requirements.",
+        formatter_class=argparse.MetavarTypeHelpFormatter
+    )  # type: ArgumentParser
+    add_data_file_argument(parser)
+    parser.add_argument(
+        "--show-all",
+        action="store_true",
+        help="Also show the areas where nothing changed."
+    )
+    parser.set_defaults(func=minimize_requirements_logic)
+
+
 def create_subparsers(sub_parsers):
     parser = sub_parsers.add_parser(
         "database",
@@ -267,6 +306,7 @@ def create_subparsers(sub_parsers):
     export_areas_command(sub_parsers)
     list_paths_with_difficulty_command(sub_parsers)
     list_paths_with_resource_command(sub_parsers)
+    minimize_requirements_command(sub_parsers)
 
     def check_command(args):
         if args.database_command is None:
@@ -73,7 +73,7 @@ def read_requirement_list(data: List[Dict],
 def read_requirement_set(data: List[List[Dict]],
                          resource_database: ResourceDatabase) -> RequirementSet:
     alternatives = read_array(data, lambda x: read_requirement_list(x, resource_database=resource_database))
-    return RequirementSet(alternative for alternative in alternatives if alternative is not None)
+    return RequirementSet(alternative for alternative in alternatives if alternative is not None).interned()
 
 
 # Resource Gain
@@ -121,20 +121,36 @@ def read_dock_weakness_database(data: Dict,
         portal=portal_types)
 
 
+def known_maximum_amounts(resource_database: ResourceDatabase) -> Dict[ResourceInfo, int]:
+    """
+    The highest amount that's possible for the resources where it doesn't depend on the layout configuration.
+    Events are either triggered or not, and tricks are either enabled or not.
+    :param resource_database:
+    :return:
+    """
+    return {
+        resource: 1
+        for resource in resource_database.event + resource_database.trick
+    }
+
+
 class WorldReader:
     resource_database: ResourceDatabase
     dock_weakness_database: DockWeaknessDatabase
+    maximum_amounts: Optional[Dict[ResourceInfo, int]]
     generic_index: int = 0
 
     def __init__(self,
                  resource_database: ResourceDatabase,
                  dock_weakness_database: DockWeaknessDatabase,
                  add_self_as_requirement_to_resources: bool,
+                 maximum_amounts: Optional[Dict[ResourceInfo, int]] = None,
                  ):
 
         self.resource_database = resource_database
         self.dock_weakness_database = dock_weakness_database
         self.add_self_as_requirement_to_resources = add_self_as_requirement_to_resources
+        self.maximum_amounts = maximum_amounts
 
     def read_node(self, data: Dict) -> Node:
         name: str = data["name"]
@@ -187,7 +203,9 @@ class WorldReader:
             for target_name, target_requirements in origin_data["connections"].items():
                 the_set = read_requirement_set(target_requirements, self.resource_database)
                 if extra_requirement is not None:
-                    the_set = the_set.union(RequirementSet([extra_requirement]))
+                    the_set = the_set.union(RequirementSet([extra_requirement])).interned()
+                if self.maximum_amounts is not None:
+                    the_set = the_set.minimized(self.maximum_amounts).interned()
 
                 if the_set != RequirementSet.impossible():
                     connections[origin][nodes_by_name[target_name]] = the_set
@@ -248,7 +266,18 @@ def read_initial_states(data: Dict[str, List], resource_database: ResourceDataba
     }
 
 
-def decode_data(data: Dict, add_self_as_requirement_to_resources: bool = True) -> GameDescription:
+def decode_data(data: Dict,
+                add_self_as_requirement_to_resources: bool = True,
+                minimize_requirements: bool = False,
+                ) -> GameDescription:
+    """
+    Creates a GameDescription from the given data.
+    :param data:
+    :param add_self_as_requirement_to_resources:
+    :param minimize_requirements: If the connections should be replaced with an equivalent with fewer alternatives,
+    using RequirementSet.minimized.
+    :return:
+    """
     game = data["game"]
     game_name = data["game_name"]
 
@@ -256,7 +285,8 @@ def decode_data(data: Dict, add_self_as_requirement_to_resources: bool = True) -
     pickup_database = read_pickup_database(data["pickup_database"], resource_database)
     dock_weakness_database = read_dock_weakness_database(data["dock_weakness_database"], resource_database)
 
-    world_reader = WorldReader(resource_database, dock_weakness_database, add_self_as_requirement_to_resources)
+    world_reader = WorldReader(resource_database, dock_weakness_database, add_self_as_requirement_to_resources,
+                               known_maximum_amounts(resource_database) if minimize_requirements else None)
     world_list = world_reader.read_world_list(data["worlds"])
 
     victory_condition = read_requirement_set(data["victory_condition"], resource_database)
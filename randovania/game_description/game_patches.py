@@ -1,7 +1,7 @@
 import copy
 import dataclasses
 from dataclasses import dataclass
-from typing import Dict, Tuple, Iterator
+from typing import Dict, Tuple, Iterator, Optional
 
 from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.dock import DockWeakness
@@ -22,6 +22,10 @@ class GamePatches:
     dock_weakness: Dict[Tuple[int, int], DockWeakness]
     extra_initial_items: ResourceGainTuple
     starting_location: AreaLocation
+    _assigned_pickup_indices_mask: Optional[int] = dataclasses.field(default=None, init=False, repr=False,
+                                                                     compare=False)
+    _pickup_resource_gains: Optional[Dict[PickupIndex, ResourceGainTuple]] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False)
 
     @classmethod
     def with_game(cls, game: "GameDescription") -> "GamePatches":
@@ -29,12 +33,17 @@ class GamePatches:
 
     def assign_new_pickups(self, assignments: Iterator[Tuple[PickupIndex, PickupEntry]]) -> "GamePatches":
         new_pickup_assignment = copy.copy(self.pickup_assignment)
+        new_gains = copy.copy(self._pickup_resource_gains)
 
         for index, pickup in assignments:
             assert index not in new_pickup_assignment
             new_pickup_assignment[index] = pickup
+            if new_gains is not None:
+                new_gains[index] = _pickup_resource_gain(index, pickup)
 
-        return dataclasses.replace(self, pickup_assignment=new_pickup_assignment)
+        result = dataclasses.replace(self, pickup_assignment=new_pickup_assignment)
+        object.__setattr__(result, "_pickup_resource_gains", new_gains)
+        return result
 
     def assign_pickup_assignment(self, assignment: PickupAssignment) -> "GamePatches":
         items: Iterator[Tuple[PickupIndex, PickupEntry]] = assignment.items()
@@ -42,3 +51,39 @@ class GamePatches:
 
     def assign_starting_location(self, location: AreaLocation) -> "GamePatches":
         return dataclasses.replace(self, starting_location=location)
+
+    @property
+    def assigned_pickup_indices_mask(self) -> int:
+        """
+        A bitset of the PickupIndex with a pickup assigned, where bit `i` is set for PickupIndex(i).
+        :return:
+        """
+        if self._assigned_pickup_indices_mask is None:
+            mask = 0
+            for index in self.pickup_assignment.keys():
+                mask |= 1 << index.index
+            object.__setattr__(self, "_assigned_pickup_indices_mask", mask)
+        return self._assigned_pickup_indices_mask
+
+    def pickup_resource_gain(self, index: PickupIndex) -> ResourceGainTuple:
+        """
+        The resources gained by collecting the given PickupIndex: the index itself, then the assigned pickup's.
+        :param index:
+        :return:
+        """
+        gains = self._pickup_resource_gains
+        if gains is None:
+            gains = {
+                assigned_index: _pickup_resource_gain(assigned_index, pickup)
+                for assigned_index, pickup in self.pickup_assignment.items()
+            }
+            object.__setattr__(self, "_pickup_resource_gains", gains)
+
+        gain = gains.get(index)
+        if gain is None:
+            return ((index, 1),)
+        return gain
+
+
+def _pickup_resource_gain(index: PickupIndex, pickup: PickupEntry) -> ResourceGainTuple:
+    return ((index, 1),) + tuple(pickup.resource_gain())
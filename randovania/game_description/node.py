@@ -3,7 +3,7 @@ from typing import NamedTuple, Union
 
 from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.dock import DockWeakness
-from randovania.game_description.resources import PickupIndex, ResourceInfo, ResourceGain
+from randovania.game_description.resources import PickupIndex, ResourceInfo, ResourceGainTuple
 
 
 class GenericNode(NamedTuple):
@@ -72,12 +72,8 @@ class PickupNode(NamedTuple):
     def resource(self) -> ResourceInfo:
         return self.pickup_index
 
-    def resource_gain_on_collect(self, patches) -> ResourceGain:
-        yield self.resource(), 1
-
-        pickup = patches.pickup_assignment.get(self.pickup_index)
-        if pickup is not None:
-            yield from pickup.resource_gain()
+    def resource_gain_on_collect(self, patches) -> ResourceGainTuple:
+        return patches.pickup_resource_gain(self.pickup_index)
 
 
 class EventNode(NamedTuple):
@@ -95,8 +91,8 @@ class EventNode(NamedTuple):
     def resource(self) -> ResourceInfo:
         return self.event
 
-    def resource_gain_on_collect(self, patches) -> ResourceGain:
-        yield self.resource(), 1
+    def resource_gain_on_collect(self, patches) -> ResourceGainTuple:
+        return ((self.event, 1),)
 
 
 ResourceNode = Union[PickupNode, EventNode]
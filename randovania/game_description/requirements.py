@@ -1,19 +1,40 @@
+import itertools
+import math
 import operator
+import weakref
 from functools import lru_cache
-from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple
+from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple, Dict, List, Sequence
 
-from randovania.game_description.resources import ResourceInfo, CurrentResources, DamageResourceInfo, ResourceDatabase, SimpleResourceInfo
+from randovania.game_description.resources import ResourceInfo, CurrentResources, DamageResourceInfo, ResourceDatabase, SimpleResourceInfo, \
+    ResourceArray
 from randovania.game_description.resource_type import ResourceType
 
 
-def _calculate_reduction(resource: DamageResourceInfo, current_resources: CurrentResources) -> float:
-    multiplier = 1
+@lru_cache(maxsize=None)
+def _minimum_energy_tanks(resource: DamageResourceInfo, amount: int) -> Tuple[int, ...]:
+    """
+    Calculates how many energy tanks are needed to take the given damage, for each combination of owned reduction items.
+    :param resource:
+    :param amount:
+    :return: A tuple indexed by a bitmask of the owned items, in the order of `resource.reductions`.
+    """
+    table = []
+    for owned in range(1 << len(resource.reductions)):
+        multiplier = 1
+        for i, reduction in enumerate(resource.reductions):
+            if (owned >> i) & 1:
+                multiplier *= reduction.damage_multiplier
 
-    for reduction in resource.reductions:
-        if current_resources.get(reduction.inventory_item, 0) > 0:
-            multiplier *= reduction.damage_multiplier
+        damage = multiplier * amount
+        tanks = max(0, math.ceil(damage / 100))
+        # Correct any rounding from the division, so it's the same as comparing with the energy
+        while tanks * 100 < damage:
+            tanks += 1
+        while tanks > 0 and (tanks - 1) * 100 >= damage:
+            tanks -= 1
+        table.append(tanks)
 
-    return multiplier
+    return tuple(table)
 
 
 class IndividualRequirement(NamedTuple):
@@ -40,10 +61,13 @@ class IndividualRequirement(NamedTuple):
             assert not self.negate, "Damage requirements shouldn't have the negate flag"
             # TODO: actually implement the damage resources
 
-            current_energy = current_resources.get(database.energy_tank, 0) * 100
-            damage = _calculate_reduction(self.resource, current_resources) * self.amount
+            owned_reductions = 0
+            for i, reduction in enumerate(self.resource.reductions):
+                if current_resources.get(reduction.inventory_item, 0) > 0:
+                    owned_reductions |= 1 << i
 
-            return current_energy >= damage
+            minimum_tanks = _minimum_energy_tanks(self.resource, self.amount)[owned_reductions]
+            return current_resources.get(database.energy_tank, 0) >= minimum_tanks
 
         has_amount = current_resources.get(self.resource, 0) >= self.amount
         if self.negate:
@@ -72,10 +96,74 @@ class IndividualRequirement(NamedTuple):
         return self._as_comparison_tuple < other._as_comparison_tuple
 
 
+CompiledAmounts = Tuple[Tuple[ResourceInfo, int], ...]
+CompiledRequirementList = Tuple[CompiledAmounts, CompiledAmounts, Tuple[IndividualRequirement, ...]]
+OrdinalAmounts = Tuple[Tuple[int, int], ...]
+OrdinalDamage = Tuple[Tuple[int, Tuple[int, ...], Tuple[int, ...]], ...]
+OrdinalRequirementList = Tuple[int, OrdinalAmounts, int, OrdinalAmounts, OrdinalDamage, Tuple[IndividualRequirement, ...]]
+
+
+def _compiled_list_satisfied(compiled: CompiledRequirementList,
+                             current_resources: CurrentResources,
+                             database: ResourceDatabase) -> bool:
+    required, forbidden, damage = compiled
+    get = current_resources.get
+
+    for resource, amount in required:
+        if get(resource, 0) < amount:
+            return False
+
+    for resource, amount in forbidden:
+        if get(resource, 0) >= amount:
+            return False
+
+    for individual in damage:
+        if not individual.satisfied(current_resources, database):
+            return False
+
+    return True
+
+
+def _ordinal_list_satisfied(compiled: OrdinalRequirementList,
+                            current_resources: ResourceArray,
+                            database: ResourceDatabase) -> bool:
+    required_mask, required, forbidden_mask, forbidden, damage, others = compiled
+    positive_mask = current_resources.positive_mask
+
+    if (positive_mask & required_mask) != required_mask or positive_mask & forbidden_mask:
+        return False
+
+    amount_at = current_resources.amount_at
+    for ordinal, amount in required:
+        if amount_at(ordinal) < amount:
+            return False
+
+    for ordinal, amount in forbidden:
+        if (positive_mask >> ordinal) & 1 and amount_at(ordinal) >= amount:
+            return False
+
+    for energy_tank, reduction_ordinals, minimum_tanks in damage:
+        owned_reductions = 0
+        for i, ordinal in enumerate(reduction_ordinals):
+            if (positive_mask >> ordinal) & 1:
+                owned_reductions |= 1 << i
+        if amount_at(energy_tank) < minimum_tanks[owned_reductions]:
+            return False
+
+    for individual in others:
+        if not individual.satisfied(current_resources, database):
+            return False
+
+    return True
+
+
 class RequirementList:
+    __slots__ = ("difficulty_level", "items", "_cached_hash", "_compiled", "_compiled_ordinals", "__weakref__")
     difficulty_level: int
     items: FrozenSet[IndividualRequirement]
-    _cached_hash: Optional[int] = None
+    _cached_hash: Optional[int]
+    _compiled: Optional[CompiledRequirementList]
+    _compiled_ordinals: Optional[Tuple["weakref.ReferenceType[ResourceDatabase]", OrdinalRequirementList]]
 
     def __deepcopy__(self, memodict):
         return self
@@ -83,6 +171,9 @@ class RequirementList:
     def __init__(self, difficulty_level: int, items: Iterable[IndividualRequirement]):
         self.difficulty_level = difficulty_level
         self.items = frozenset(items)
+        self._cached_hash = None
+        self._compiled = None
+        self._compiled_ordinals = None
 
     @classmethod
     def with_single_resource(cls, resource: ResourceInfo) -> "RequirementList":
@@ -109,11 +200,26 @@ class RequirementList:
 
             to_add.append(individual)
 
-        return cls(difficulty, to_add)
+        return cls(difficulty, to_add).interned()
+
+    def interned(self) -> "RequirementList":
+        """
+        Gets the shared RequirementList with the same difficulty and items as this one.
+        The items of a new shared list are shared with every other interned list as well.
+        :return: self, if no such list exists yet.
+        """
+        existing = _interned_lists.get(self.items)
+        if existing is None:
+            self.items = frozenset(_interned_individuals.setdefault(individual, individual)
+                                   for individual in self.items)
+            existing = _interned_lists.setdefault(self.items, self)
+
+        if existing.difficulty_level != self.difficulty_level:
+            return self
+        return existing
 
     def __eq__(self, other):
-        return isinstance(
-            other, RequirementList) and self.items == other.items
+        return self is other or (isinstance(other, RequirementList) and self.items == other.items)
 
     def __lt__(self, other: "RequirementList"):
         return self.items < other.items
@@ -144,8 +250,83 @@ class RequirementList:
         :param current_resources:
         :return:
         """
-        return all(requirement.satisfied(current_resources, database)
-                   for requirement in self.values())
+        if isinstance(current_resources, ResourceArray):
+            return _ordinal_list_satisfied(self.compiled_ordinals(current_resources.database),
+                                           current_resources, database)
+        return _compiled_list_satisfied(self.compiled, current_resources, database)
+
+    @property
+    def compiled(self) -> CompiledRequirementList:
+        """
+        A flattened form of this list, used for quickly checking if it's satisfied.
+        Contains the (resource, amount) pairs that must be reached, the (resource, amount) pairs that must not be
+        reached and the damage requirements, which depends on the other resources.
+        :return:
+        """
+        if self._compiled is None:
+            required = []
+            forbidden = []
+            damage = []
+            for individual in self.sorted:
+                if isinstance(individual.resource, DamageResourceInfo):
+                    assert not individual.negate, "Damage requirements shouldn't have the negate flag"
+                    damage.append(individual)
+                elif individual.negate:
+                    forbidden.append((individual.resource, individual.amount))
+                else:
+                    required.append((individual.resource, individual.amount))
+            self._compiled = tuple(required), tuple(forbidden), tuple(damage)
+
+        return self._compiled
+
+    def compiled_ordinals(self, database: ResourceDatabase) -> OrdinalRequirementList:
+        """
+        A form of this list for checking against a ResourceArray of the given database.
+        Contains a bitmask of the ordinals that must be positive, the (ordinal, amount) pairs above one that must be
+        reached, a bitmask of the ordinals that must not be positive, the (ordinal, amount) pairs above one that
+        must not be reached, the damage requirements and the requirements that are checked individually.
+        Each damage requirement is the energy tank ordinal, the reduction item ordinals and the minimum energy tanks
+        for each combination of owned reduction items.
+        :param database:
+        :return:
+        """
+        if self._compiled_ordinals is None or self._compiled_ordinals[0] is not database.reference:
+            required_mask = 0
+            required = []
+            forbidden_mask = 0
+            forbidden = []
+            damage = []
+            others = []
+            for individual in self.sorted:
+                try:
+                    ordinal = database.resource_ordinal(individual.resource)
+                except KeyError:
+                    ordinal = None
+
+                if isinstance(individual.resource, DamageResourceInfo) and ordinal is not None:
+                    assert not individual.negate, "Damage requirements shouldn't have the negate flag"
+                    damage.append((
+                        database.resource_ordinal(database.energy_tank),
+                        tuple(database.resource_ordinal(reduction.inventory_item)
+                              for reduction in individual.resource.reductions),
+                        _minimum_energy_tanks(individual.resource, individual.amount),
+                    ))
+                elif ordinal is None or isinstance(individual.resource, DamageResourceInfo) or individual.amount <= 0:
+                    others.append(individual)
+                elif individual.negate:
+                    if individual.amount == 1:
+                        forbidden_mask |= 1 << ordinal
+                    else:
+                        forbidden.append((ordinal, individual.amount))
+                else:
+                    required_mask |= 1 << ordinal
+                    if individual.amount > 1:
+                        required.append((ordinal, individual.amount))
+
+            self._compiled_ordinals = database.reference, (required_mask, tuple(required), forbidden_mask,
+                                                           tuple(forbidden), tuple(damage), tuple(others))
+
+        return self._compiled_ordinals[1]
 
     def simplify(self,
                  static_resources: CurrentResources,
@@ -202,6 +383,54 @@ class RequirementList:
     def values(self) -> FrozenSet[IndividualRequirement]:
         return self.items
 
+    def minimized(self, maximum_amounts: Dict[ResourceInfo, int]) -> Optional["RequirementList"]:
+        """
+        Creates an equivalent RequirementList with at most one IndividualRequirement for each resource and negate flag,
+        without the ones that are always satisfied.
+        :param maximum_amounts: The highest amount that's possible for some resources.
+        :return: None if this RequirementList can never be satisfied.
+        """
+        at_least: Dict[ResourceInfo, int] = {}
+        less_than: Dict[ResourceInfo, int] = {}
+
+        for individual in self.items:
+            resource, amount = individual.resource, individual.amount
+            if individual.negate:
+                if amount <= 0:
+                    return None
+                if amount <= maximum_amounts.get(resource, amount):
+                    less_than[resource] = min(less_than.get(resource, amount), amount)
+            elif amount > 0:
+                if amount > maximum_amounts.get(resource, amount):
+                    return None
+                at_least[resource] = max(at_least.get(resource, amount), amount)
+
+        if any(amount <= at_least.get(resource, 0) for resource, amount in less_than.items()):
+            return None
+
+        return RequirementList(self.difficulty_level, itertools.chain(
+            (IndividualRequirement(resource, amount, False) for resource, amount in at_least.items()),
+            (IndividualRequirement(resource, amount, True) for resource, amount in less_than.items()),
+        ))
+
+    def is_implied_by(self, other: "RequirementList") -> bool:
+        """
+        Checks if this list is always satisfied when the other is, at the same or lower difficulty.
+        Only correct for lists created by `minimized`.
+        :param other:
+        :return:
+        """
+        if self.difficulty_level > other.difficulty_level:
+            return False
+
+        other_amounts = {(individual.resource, individual.negate): individual.amount for individual in other.items}
+        for individual in self.items:
+            amount = other_amounts.get((individual.resource, individual.negate))
+            if amount is None or (amount > individual.amount if individual.negate else amount < individual.amount):
+                return False
+
+        return True
+
     def union(self, other: "RequirementList") -> "RequirementList":
         return RequirementList(max(self.difficulty_level, other.difficulty_level),
                                self.items | other.items)
@@ -211,13 +440,108 @@ class RequirementList:
         return tuple(sorted(self.items))
 
 
+# IndividualRequirement can't be weakly referenced, but there's only a few hundred distinct ones in a database
+_interned_individuals: Dict[IndividualRequirement, IndividualRequirement] = {}
+_interned_lists: "weakref.WeakValueDictionary[FrozenSet[IndividualRequirement], RequirementList]" = \
+    weakref.WeakValueDictionary()
+_interned_sets: "weakref.WeakValueDictionary[FrozenSet[RequirementList], RequirementSet]" = \
+    weakref.WeakValueDictionary()
+
+# Below this many alternatives, directly comparing every pair is faster than building the bitmasks
+_DIRECT_SUBSUMPTION_LIMIT = 32
+
+
+def _remove_dominated_alternatives(alternatives: FrozenSet[RequirementList]) -> FrozenSet[RequirementList]:
+    """
+    Removes all alternatives that have another alternative as a strict subset.
+    For bigger inputs, each alternative becomes a bitmask of its IndividualRequirement. Alternatives are processed by increasing size and
+    only checked against the smaller alternatives that were kept, found by the lowest bit of their mask.
+    :param alternatives:
+    :return: The kept alternatives, in the same iteration order as the given ones.
+    """
+    ordered = tuple(alternatives)
+    if len(ordered) < 2:
+        return alternatives
+
+    if len(ordered) <= _DIRECT_SUBSUMPTION_LIMIT:
+        return frozenset(
+            requirement
+            for requirement in ordered
+            if not any(other < requirement for other in ordered)
+        )
+
+    if any(not alternative.items for alternative in ordered):
+        # The trivial alternative is a subset of everything else
+        return frozenset(alternative for alternative in ordered if not alternative.items)
+
+    bit_for_individual: Dict[IndividualRequirement, int] = {}
+    masks = [_alternative_mask(alternative, bit_for_individual) for alternative in ordered]
+    keep = _minimal_masks(masks)
+
+    return frozenset(alternative for alternative, kept in zip(ordered, keep) if kept)
+
+
+def _alternative_mask(alternative: RequirementList, bit_for_individual: Dict[IndividualRequirement, int]) -> int:
+    """
+    Creates a bitmask of the IndividualRequirement in the given alternative, adding new bits as needed.
+    :param alternative:
+    :param bit_for_individual:
+    :return:
+    """
+    mask = 0
+    for individual in alternative.items:
+        bit = bit_for_individual.get(individual)
+        if bit is None:
+            bit = bit_for_individual[individual] = 1 << len(bit_for_individual)
+        mask |= bit
+    return mask
+
+
+def _minimal_masks(masks: List[int]) -> List[bool]:
+    """
+    Finds which of the given distinct masks have no other mask as a strict subset.
+    :param masks:
+    :return: For each mask, if it should be kept.
+    """
+    keep = [True] * len(masks)
+    kept_by_lowest_bit: Dict[int, List[int]] = {}
+    sizes = [bin(mask).count("1") for mask in masks]
+
+    by_size = sorted(range(len(masks)), key=sizes.__getitem__)
+    for _, same_size in itertools.groupby(by_size, key=sizes.__getitem__):
+        same_size = list(same_size)
+
+        # Alternatives of the same size can't be a strict subset of each other
+        for i in same_size:
+            mask = masks[i]
+            remaining = mask
+            while remaining and keep[i]:
+                bit = remaining & -remaining
+                remaining ^= bit
+                for other in kept_by_lowest_bit.get(bit, ()):
+                    if other & mask == other:
+                        keep[i] = False
+                        break
+
+        for i in same_size:
+            if keep[i]:
+                kept_by_lowest_bit.setdefault(masks[i] & -masks[i], []).append(masks[i])
+
+    return keep
+
+
 class RequirementSet:
     """
     Represents multiple alternatives of satisfying a requirement.
     For example, going from A to B may be possible by having Grapple+Space Jump or Screw Attack.
     """
+    __slots__ = ("alternatives", "_cached_hash", "_compiled", "_compiled_ordinals", "_resource_ordinals",
+                 "__weakref__")
     alternatives: FrozenSet[RequirementList]
-    _cached_hash: Optional[int] = None
+    _cached_hash: Optional[int]
+    _compiled: Optional[Tuple[CompiledRequirementList, ...]]
+    _compiled_ordinals: Optional[Tuple["weakref.ReferenceType[ResourceDatabase]", Tuple[OrdinalRequirementList, ...]]]
+    _resource_ordinals: Optional[Tuple["weakref.ReferenceType[ResourceDatabase]", FrozenSet[int]]]
 
     def __init__(self, alternatives: Iterable[RequirementList]):
         """
@@ -225,19 +549,36 @@ class RequirementSet:
         Redundant alternatives (Bombs or Bombs + Space Jump) are automatically removed.
         :param alternatives:
         """
-        input_set = frozenset(alternatives)
-        self.alternatives = frozenset(
-            requirement
-            for requirement in input_set
-            if not any(other < requirement for other in input_set)
-        )
+        self.alternatives = _remove_dominated_alternatives(frozenset(alternatives))
+        self._cached_hash = None
+        self._compiled = None
+        self._compiled_ordinals = None
+        self._resource_ordinals = None
 
     def __deepcopy__(self, memodict):
         return self
 
+    def interned(self) -> "RequirementSet":
+        """
+        Gets the shared RequirementSet with the same alternatives as this one, also taking the difficulty of each
+        alternative into account. The alternatives of a new shared set are interned as well.
+        :return: self, if no such set exists yet.
+        """
+        existing = _interned_sets.get(self.alternatives)
+        if existing is None:
+            self.alternatives = frozenset(alternative.interned() for alternative in self.alternatives)
+            existing = _interned_sets.setdefault(self.alternatives, self)
+
+        if existing is not self:
+            difficulties = {alternative.items: alternative.difficulty_level for alternative in existing.alternatives}
+            if any(difficulties[alternative.items] != alternative.difficulty_level
+                   for alternative in self.alternatives):
+                return self
+
+        return existing
+
     def __eq__(self, other):
-        return isinstance(
-            other, RequirementSet) and self.alternatives == other.alternatives
+        return self is other or (isinstance(other, RequirementSet) and self.alternatives == other.alternatives)
 
     def __hash__(self) -> int:
         if self._cached_hash is None:
@@ -265,13 +606,13 @@ class RequirementSet:
     @lru_cache()
     def trivial(cls) -> "RequirementSet":
         # empty RequirementList.satisfied is True
-        return cls([RequirementList(0, [])])
+        return cls([RequirementList(0, [])]).interned()
 
     @classmethod
     @lru_cache()
     def impossible(cls) -> "RequirementSet":
         # No alternatives makes satisfied always return False
-        return cls([])
+        return cls([]).interned()
 
     def satisfied(self, current_resources: CurrentResources, database: ResourceDatabase) -> bool:
         """
@@ -281,9 +622,35 @@ class RequirementSet:
         :param current_resources:
         :return:
         """
-        return any(
-            requirement_list.satisfied(current_resources, database)
-            for requirement_list in self.alternatives)
+        if isinstance(current_resources, ResourceArray):
+            positive_mask = current_resources.positive_mask
+            for compiled in self.compiled_ordinals(current_resources.database):
+                if (positive_mask & compiled[0]) == compiled[0] and _ordinal_list_satisfied(compiled,
+                                                                                            current_resources,
+                                                                                            database):
+                    return True
+
+            return False
+
+        if self._compiled is None:
+            self._compiled = tuple(alternative.compiled for alternative in self.alternatives)
+
+        for compiled in self._compiled:
+            if _compiled_list_satisfied(compiled, current_resources, database):
+                return True
+
+        return False
+
+    def compiled_ordinals(self, database: ResourceDatabase) -> Tuple[OrdinalRequirementList, ...]:
+        """
+        The RequirementList.compiled_ordinals of all alternatives, for the given database.
+        :param database:
+        :return:
+        """
+        if self._compiled_ordinals is None or self._compiled_ordinals[0] is not database.reference:
+            self._compiled_ordinals = database.reference, tuple(alternative.compiled_ordinals(database)
+                                                                for alternative in self.alternatives)
+        return self._compiled_ordinals[1]
 
     def minimum_satisfied_difficulty(self,
                                      current_resources: CurrentResources,
@@ -318,6 +685,27 @@ class RequirementSet:
                               # RequirementList.simplify may return None
                               if alternative is not None)
 
+    def minimized(self, maximum_amounts: Dict[ResourceInfo, int]) -> "RequirementSet":
+        """
+        Creates an equivalent RequirementSet with fewer alternatives. Each alternative is minimized, then any
+        alternative implied by another one is removed, taking the amounts into account.
+        When two alternatives are the same, the one with the lowest difficulty is kept.
+        :param maximum_amounts: The highest amount that's possible for some resources.
+        :return:
+        """
+        alternatives = sorted(
+            (alternative
+             for alternative in (alternative.minimized(maximum_amounts) for alternative in self.alternatives)
+             if alternative is not None),
+            key=lambda alternative: (alternative.difficulty_level, alternative.sorted))
+
+        return RequirementSet(
+            alternative
+            for i, alternative in enumerate(alternatives)
+            if not any(other.is_implied_by(alternative) and (j < i or not alternative.is_implied_by(other))
+                       for j, other in enumerate(alternatives) if j != i)
+        )
+
     def replace(self, individual: IndividualRequirement, replacements: "RequirementSet") -> "RequirementSet":
         result = []
 
@@ -330,17 +718,82 @@ class RequirementSet:
 
         return RequirementSet(result)
 
-    def union(self, other: "RequirementSet") -> "RequirementSet":
-        """Create a new RequirementSet that is only satisfied when both are satisfied"""
-        return RequirementSet(
-            a.union(b)
-            for a in self.alternatives
-            for b in other.alternatives)
+    @property
+    def _is_trivial(self) -> bool:
+        if len(self.alternatives) != 1:
+            return False
+        alternative = next(iter(self.alternatives))
+        return not alternative.items and alternative.difficulty_level == 0
+
+    def union(self, other: "RequirementSet", max_alternatives: Optional[int] = None) -> "RequirementSet":
+        """
+        Create a new RequirementSet that is only satisfied when both are satisfied.
+        Combinations of alternatives are pruned as bitmasks, so the dominated ones are never created.
+        :param other:
+        :param max_alternatives: Opt-in cap. If given and the union has more alternatives than this, only the ones
+        with the fewest items are kept, ties broken by their sorted items. The cap is conservative: it only drops
+        alternatives of the real union and never adds any, so the result is never satisfied when the real union isn't,
+        but it may miss some ways of satisfying it.
+        :return:
+        """
+        if not self.alternatives or not other.alternatives:
+            return RequirementSet.impossible()
+
+        if other._is_trivial:
+            result = self
+        elif self._is_trivial:
+            result = other
+        elif len(self.alternatives) * len(other.alternatives) <= _DIRECT_SUBSUMPTION_LIMIT:
+            result = RequirementSet(a.union(b) for a in self.alternatives for b in other.alternatives)
+        else:
+            # Combine the bitmasks of the alternatives first, only creating the RequirementList that are kept.
+            # For repeated combinations the first one created wins, like when building a frozenset of all of them.
+            bit_for_individual: Dict[IndividualRequirement, int] = {}
+            other_masks = [(b, _alternative_mask(b, bit_for_individual)) for b in other.alternatives]
+            combinations: Dict[int, Tuple[RequirementList, RequirementList]] = {}
+            for a in self.alternatives:
+                a_mask = _alternative_mask(a, bit_for_individual)
+                for b, b_mask in other_masks:
+                    combinations.setdefault(a_mask | b_mask, (a, b))
+
+            masks = list(combinations.keys())
+            kept = [a.union(b)
+                    for (a, b), keep in zip(combinations.values(), _minimal_masks(masks))
+                    if keep]
+            result = RequirementSet(kept)
+
+        if max_alternatives is not None and len(result.alternatives) > max_alternatives:
+            result = RequirementSet(sorted(result.alternatives,
+                                           key=lambda alternative: (len(alternative.items),
+                                                                    alternative.sorted))[:max_alternatives])
+
+        return result
 
     def expand_alternatives(self, other: "RequirementSet") -> "RequirementSet":
         """Create a new RequirementSet that is satisfied when either are satisfied."""
         return RequirementSet(self.alternatives | other.alternatives)
 
+    def resource_ordinals(self, database: ResourceDatabase) -> FrozenSet[int]:
+        """
+        The ordinals of all resources whose amount can change if this set is satisfied or not.
+        For damage requirements, that's the energy tank and the items that reduce the damage.
+        :param database:
+        :return:
+        """
+        if self._resource_ordinals is None or self._resource_ordinals[0] is not database.reference:
+            resources = set()
+            for alternative in self.alternatives:
+                for individual in alternative.values():
+                    resources.add(individual.resource)
+                    if isinstance(individual.resource, DamageResourceInfo):
+                        resources.add(database.energy_tank)
+                        resources.update(reduction.inventory_item for reduction in individual.resource.reductions)
+
+            self._resource_ordinals = database.reference, frozenset(database.resource_ordinal(resource)
+                                                                    for resource in resources)
+
+        return self._resource_ordinals[1]
+
     @property
     def dangerous_resources(self) -> Iterator[SimpleResourceInfo]:
         """
@@ -361,3 +814,67 @@ class RequirementSet:
 
 
 SatisfiableRequirements = FrozenSet[RequirementList]
+
+
+def satisfied_for_candidates(requirements: Sequence[RequirementSet],
+                             candidates: Sequence[ResourceArray],
+                             database: ResourceDatabase,
+                             ) -> List[int]:
+    """
+    Checks all given RequirementSet against all candidate resources at once.
+    Each resource that must be present or absent is checked for all candidates with a single bitwise operation,
+    only amounts, damage and other requirements are checked for each candidate.
+    :param requirements:
+    :param candidates: ResourceArray of the same database.
+    :param database:
+    :return: For each RequirementSet, a bitmask of the candidates that satisfy it.
+    """
+    if not candidates:
+        return [0] * len(requirements)
+
+    resources_database = candidates[0].database
+    all_candidates = (1 << len(candidates)) - 1
+    candidates_with_bit: Dict[int, int] = {}
+
+    def candidates_with(mask: int) -> int:
+        result = all_candidates
+        while mask and result:
+            bit = mask & -mask
+            mask ^= bit
+            column = candidates_with_bit.get(bit)
+            if column is None:
+                column = candidates_with_bit[bit] = sum(1 << i for i, candidate in enumerate(candidates)
+                                                        if candidate.positive_mask & bit)
+            result &= column
+        return result
+
+    def candidates_without(mask: int) -> int:
+        result = all_candidates
+        while mask and result:
+            bit = mask & -mask
+            mask ^= bit
+            result &= ~candidates_with(bit)
+        return result
+
+    results = []
+    for requirement_set in requirements:
+        satisfied = 0
+        for compiled in requirement_set.compiled_ordinals(resources_database):
+            required_mask, required, forbidden_mask, forbidden, damage, others = compiled
+            matching = candidates_with(required_mask) & candidates_without(forbidden_mask) & ~satisfied
+
+            if matching and (required or forbidden or damage or others):
+                remaining = matching
+                while remaining:
+                    bit = remaining & -remaining
+                    remaining ^= bit
+                    if not _ordinal_list_satisfied(compiled, candidates[bit.bit_length() - 1], database):
+                        matching ^= bit
+
+            satisfied |= matching
+            if satisfied == all_candidates:
+                break
+
+        results.append(satisfied)
+
+    return results
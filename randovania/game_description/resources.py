@@ -1,4 +1,9 @@
-from typing import NamedTuple, Tuple, Union, List, Dict, Iterator
+import collections
+import itertools
+import weakref
+from array import array
+from collections.abc import KeysView, ItemsView, ValuesView
+from typing import NamedTuple, Tuple, Union, List, Dict, Iterator, Optional, Mapping, FrozenSet
 
 from randovania.game_description.resource_type import ResourceType
 
@@ -37,6 +42,7 @@ class DamageResourceInfo(NamedTuple):
 
 
 class PickupIndex:
+    __slots__ = ("_index",)
     _index: int
 
     @property
@@ -111,7 +117,7 @@ def find_resource_info_with_long_name(info_list: List[ResourceInfo], long_name:
         "Resource with long_name '{}' not found in {}".format(long_name, info_list))
 
 
-class ResourceDatabase(NamedTuple):
+class ResourceDatabase:
     item: List[SimpleResourceInfo]
     event: List[SimpleResourceInfo]
     trick: List[SimpleResourceInfo]
@@ -119,6 +125,67 @@ class ResourceDatabase(NamedTuple):
     version: List[SimpleResourceInfo]
     misc: List[SimpleResourceInfo]
     difficulty: List[SimpleResourceInfo]
+    ordinals: Dict[ResourceInfo, int]
+    _pickup_index_base: int
+    _energy_tank: Optional[SimpleResourceInfo] = None
+
+    # Identifies this database in the data calculated for it, without keeping it alive
+    reference: "weakref.ReferenceType[ResourceDatabase]"
+
+    # For each of the last static resources used, the connections of the games using this database simplified with
+    # them. Managed by WorldList.simplify_connections.
+    simplified_connections: "collections.OrderedDict[FrozenSet[Tuple[ResourceInfo, int]], Dict]"
+
+    def __init__(self,
+                 item: List[SimpleResourceInfo],
+                 event: List[SimpleResourceInfo],
+                 trick: List[SimpleResourceInfo],
+                 damage: List[DamageResourceInfo],
+                 version: List[SimpleResourceInfo],
+                 misc: List[SimpleResourceInfo],
+                 difficulty: List[SimpleResourceInfo],
+                 ):
+        self.item = item
+        self.event = event
+        self.trick = trick
+        self.damage = damage
+        self.version = version
+        self.misc = misc
+        self.difficulty = difficulty
+
+        self.ordinals = {}
+        for resource in itertools.chain(item, event, trick, damage, version, misc, difficulty):
+            self.ordinals.setdefault(resource, len(self.ordinals))
+        self._pickup_index_base = len(self.ordinals)
+        self.reference = weakref.ref(self)
+        self.simplified_connections = collections.OrderedDict()
+
+    def __repr__(self):
+        return "ResourceDatabase(item={}, event={}, trick={}, damage={}, version={}, misc={}, difficulty={})".format(
+            self.item, self.event, self.trick, self.damage, self.version, self.misc, self.difficulty)
+
+    def resource_ordinal(self, resource: ResourceInfo) -> int:
+        """
+        Gets a dense index for the given resource, unique in this database.
+        PickupIndex are placed after all other resources, in order of their index.
+        :param resource:
+        :return:
+        """
+        ordinal = self.ordinals.get(resource)
+        if ordinal is None:
+            if not isinstance(resource, PickupIndex):
+                raise KeyError(resource)
+            ordinal = self._pickup_index_base + resource.index
+            self.ordinals[resource] = ordinal
+        return ordinal
+
+    @property
+    def first_pickup_index_ordinal(self) -> int:
+        """
+        The ordinal of PickupIndex(0). Any other PickupIndex follows it, in order.
+        :return:
+        """
+        return self._pickup_index_base
 
     def get_by_type(self, resource_type: ResourceType) -> List[ResourceInfo]:
         if resource_type == ResourceType.ITEM:
@@ -158,8 +225,10 @@ class ResourceDatabase(NamedTuple):
         return self.get_by_type_and_index(ResourceType.DIFFICULTY, 0)
 
     @property
-    def energy_tank(self):
-        return self.get_by_type_and_index(ResourceType.ITEM, 42)
+    def energy_tank(self) -> SimpleResourceInfo:
+        if self._energy_tank is None:
+            self._energy_tank = self.get_by_type_and_index(ResourceType.ITEM, 42)
+        return self._energy_tank
 
 
 PickupAssignment = Dict[PickupIndex, PickupEntry]
@@ -197,6 +266,240 @@ class PickupDatabase(NamedTuple):
         return self.pickups[pickup_name]
 
 
+# How many changed amounts a ResourceArray keeps over amounts it shares with a copy, before using its own amounts again
+_MAX_SHARED_CHANGES = 16
+
+
+class ResourceArray:
+    """
+    A CurrentResources that stores the amounts in an array, indexed by the database's resource ordinals.
+    Supports the same operations as a dict, with iteration in insertion order.
+    Copies share the array and the keys with the original. Changes to either are then kept in small dicts
+    over the shared data, until there are too many and the data is copied.
+    """
+    __slots__ = ("database", "amounts", "positive_mask", "_present_mask", "_keys", "_changes", "_new_keys")
+    database: ResourceDatabase
+    amounts: array
+    positive_mask: int
+    _present_mask: int
+    _keys: List[ResourceInfo]
+    _changes: Optional[Dict[int, int]]
+    _new_keys: Optional[List[ResourceInfo]]
+
+    def __init__(self, database: ResourceDatabase, resources: Optional[Mapping[ResourceInfo, int]] = None):
+        self.database = database
+        self.amounts = array("q")
+        self.amounts.frombytes(bytes(self.amounts.itemsize * len(database.ordinals)))
+        self.positive_mask = 0
+        self._present_mask = 0
+        self._keys = []
+        self._changes = None
+        self._new_keys = None
+        if resources is not None:
+            for resource, amount in resources.items():
+                self[resource] = amount
+
+    def copy(self) -> "ResourceArray":
+        if self._changes is None:
+            self._changes = {}
+            self._new_keys = []
+
+        result = ResourceArray.__new__(ResourceArray)
+        result.database = self.database
+        result.amounts = self.amounts
+        result.positive_mask = self.positive_mask
+        result._present_mask = self._present_mask
+        result._keys = self._keys
+        result._changes = dict(self._changes)
+        result._new_keys = self._new_keys[:]
+        return result
+
+    __copy__ = copy
+
+    def _stop_sharing(self):
+        """
+        Uses a copy of the shared amounts and keys, with the changes applied.
+        """
+        if self._changes is None:
+            return
+
+        amounts = self.amounts[:]
+        if self._changes:
+            size = max(self._changes) + 1
+            if size > len(amounts):
+                amounts.frombytes(bytes(amounts.itemsize * (size - len(amounts))))
+            for ordinal, amount in self._changes.items():
+                amounts[ordinal] = amount
+
+        self.amounts = amounts
+        self._keys = self._keys + self._new_keys
+        self._changes = None
+        self._new_keys = None
+
+    def amount_at(self, ordinal: int) -> int:
+        """
+        Gets the amount of the resource with the given ordinal, or 0 if not present.
+        :param ordinal:
+        :return:
+        """
+        if self._changes is not None:
+            amount = self._changes.get(ordinal)
+            if amount is not None:
+                return amount
+        if ordinal < len(self.amounts):
+            return self.amounts[ordinal]
+        return 0
+
+    def _ordinal(self, resource: ResourceInfo) -> Optional[int]:
+        ordinal = self.database.ordinals.get(resource)
+        if ordinal is None:
+            try:
+                ordinal = self.database.resource_ordinal(resource)
+            except KeyError:
+                return None
+        return ordinal
+
+    def get(self, resource: ResourceInfo, default=None):
+        ordinal = self._ordinal(resource)
+        if ordinal is not None and (self._present_mask >> ordinal) & 1:
+            return self.amount_at(ordinal)
+        return default
+
+    def __getitem__(self, resource: ResourceInfo) -> int:
+        ordinal = self._ordinal(resource)
+        if ordinal is None or not (self._present_mask >> ordinal) & 1:
+            raise KeyError(resource)
+        return self.amount_at(ordinal)
+
+    def __contains__(self, resource) -> bool:
+        ordinal = self._ordinal(resource)
+        return ordinal is not None and bool((self._present_mask >> ordinal) & 1)
+
+    def __setitem__(self, resource: ResourceInfo, amount: int):
+        self._set_at(self.database.resource_ordinal(resource), resource, amount)
+
+    def _set_at(self, ordinal: int, resource: ResourceInfo, amount: int):
+        bit = 1 << ordinal
+
+        if self._changes is not None and len(self._changes) >= _MAX_SHARED_CHANGES and ordinal not in self._changes:
+            self._stop_sharing()
+
+        if not self._present_mask & bit:
+            self._present_mask |= bit
+            if self._changes is None:
+                self._keys.append(resource)
+            else:
+                self._new_keys.append(resource)
+
+        if self._changes is None:
+            if ordinal >= len(self.amounts):
+                self.amounts.frombytes(bytes(self.amounts.itemsize * (ordinal + 1 - len(self.amounts))))
+            self.amounts[ordinal] = amount
+        else:
+            self._changes[ordinal] = amount
+
+        if amount > 0:
+            self.positive_mask |= bit
+        else:
+            self.positive_mask &= ~bit
+
+    def add_resource_gain(self, resource_gain: ResourceGainTuple):
+        """
+        Adds the quantities of the given gain to the current amounts. Missing resources start at 0.
+        :param resource_gain:
+        :return:
+        """
+        for resource, quantity in resource_gain:
+            ordinal = self.database.resource_ordinal(resource)
+            if (self._present_mask >> ordinal) & 1:
+                quantity += self.amount_at(ordinal)
+            self._set_at(ordinal, resource, quantity)
+
+    def __delitem__(self, resource: ResourceInfo):
+        ordinal = self._ordinal(resource)
+        if ordinal is None or not (self._present_mask >> ordinal) & 1:
+            raise KeyError(resource)
+
+        self._stop_sharing()
+        bit = 1 << ordinal
+        self._present_mask &= ~bit
+        self.positive_mask &= ~bit
+        self.amounts[ordinal] = 0
+        self._keys.remove(resource)
+
+    def changed_ordinals(self, other: "ResourceArray") -> List[int]:
+        """
+        Lists the ordinals with a different amount in the given ResourceArray, of the same database.
+        A resource that isn't present is considered to have amount 0.
+        :param other:
+        :return:
+        """
+        if self.amounts is other.amounts:
+            if self._changes == other._changes:
+                return []
+            return sorted(
+                ordinal
+                for ordinal in (self._changes or {}).keys() | (other._changes or {}).keys()
+                if self.amount_at(ordinal) != other.amount_at(ordinal)
+            )
+
+        if self._changes is None and other._changes is None and self.amounts == other.amounts:
+            return []
+
+        candidates = {
+            ordinal
+            for ordinal, (amount, other_amount) in enumerate(itertools.zip_longest(self.amounts, other.amounts,
+                                                                                  fillvalue=0))
+            if amount != other_amount
+        }
+        candidates.update(self._changes or ())
+        candidates.update(other._changes or ())
+        return sorted(
+            ordinal
+            for ordinal in candidates
+            if self.amount_at(ordinal) != other.amount_at(ordinal)
+        )
+
+    def changed_presence_ordinals(self, other: "ResourceArray") -> List[int]:
+        """
+        Lists the ordinals of the resources that are present in only one of this and the given ResourceArray.
+        :param other:
+        :return:
+        """
+        mask = self._present_mask ^ other._present_mask
+        result = []
+        while mask:
+            bit = mask & -mask
+            result.append(bit.bit_length() - 1)
+            mask ^= bit
+        return result
+
+    def __iter__(self) -> Iterator[ResourceInfo]:
+        if self._new_keys:
+            return itertools.chain(self._keys, self._new_keys)
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._new_keys or ())
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def __eq__(self, other):
+        if isinstance(other, ResourceArray):
+            other = dict(other.items())
+        return isinstance(other, dict) and dict(self.items()) == other
+
+    def __repr__(self):
+        return "ResourceArray({})".format(dict(self.items()))
+
+
 def merge_resources(a: CurrentResources, b: CurrentResources) -> CurrentResources:
     return {
         resource: a.get(resource, 0) + b.get(resource, 0)
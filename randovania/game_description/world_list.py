@@ -10,12 +10,19 @@ from randovania.game_description.requirements import RequirementSet
 from randovania.game_description.resources import CurrentResources, ResourceDatabase, ResourceInfo
 from randovania.game_description.world import World
 
+# How many different static resources each ResourceDatabase keeps simplified connections for.
+# Copies of a GameDescription share the ResourceDatabase, so the simplified connections are shared by every copy.
+# They're stored in the database itself, so they're collected together with it.
+_SIMPLIFIED_CACHE_SIZE = 8
+
 
 class WorldList:
     worlds: List[World]
 
     _nodes_to_area: Dict[Node, Area]
     _nodes_to_world: Dict[Node, World]
+    _nodes: Tuple[Node, ...]
+    _node_ordinals: Dict[Node, int]
 
     def __deepcopy__(self, memodict):
         return WorldList(
@@ -25,6 +32,8 @@ class WorldList:
     def __init__(self, worlds: List[World]):
         self.worlds = worlds
         self._nodes_to_area, self._nodes_to_world = _calculate_nodes_to_area_world(worlds)
+        self._nodes = tuple(self.all_nodes)
+        self._node_ordinals = {node: ordinal for ordinal, node in enumerate(self._nodes)}
 
     def world_by_asset_id(self, asset_id: int) -> World:
         for world in self.worlds:
@@ -78,6 +87,21 @@ class WorldList:
 
         raise ValueError("Unknown name: {}".format(name))
 
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def node_to_ordinal(self, node: Node) -> int:
+        """
+        The position of the given node in all_nodes.
+        :param node:
+        :return:
+        """
+        return self._node_ordinals[node]
+
+    def node_from_ordinal(self, ordinal: int) -> Node:
+        return self._nodes[ordinal]
+
     def nodes_to_world(self, node: Node) -> World:
         return self._nodes_to_world[node]
 
@@ -164,11 +188,19 @@ class WorldList:
         :param static_resources:
         :return:
         """
+        simplified = _simplified_requirements_for(static_resources, resource_database)
+
         for world in self.worlds:
             for area in world.areas:
                 for connections in area.connections.values():
                     for target, value in connections.items():
-                        connections[target] = value.simplify(static_resources, resource_database)
+                        new_value = simplified.get(value)
+                        if new_value is None:
+                            new_value = simplified[value] = value.simplify(static_resources,
+                                                                           resource_database).interned()
+                            # Simplifying again with the same resources doesn't change anything
+                            simplified.setdefault(new_value, new_value)
+                        connections[target] = new_value
 
     def calculate_relevant_resources(self, patches: GamePatches) -> FrozenSet[ResourceInfo]:
         results = set()
@@ -209,3 +241,25 @@ def _calculate_nodes_to_area_world(worlds: Iterable[World]):
                 nodes_to_world[node] = world
 
     return nodes_to_area, nodes_to_world
+
+
+def _simplified_requirements_for(static_resources: CurrentResources,
+                                 resource_database: ResourceDatabase,
+                                 ) -> Dict[RequirementSet, RequirementSet]:
+    """
+    Gets the shared cache of RequirementSet simplified with the given static resources.
+    :param static_resources:
+    :param resource_database:
+    :return: A dict of the original RequirementSet to the interned simplified RequirementSet.
+    """
+    by_static_resources = resource_database.simplified_connections
+    key = frozenset(static_resources.items())
+    simplified = by_static_resources.get(key)
+    if simplified is None:
+        simplified = by_static_resources[key] = {}
+        if len(by_static_resources) > _SIMPLIFIED_CACHE_SIZE:
+            by_static_resources.popitem(last=False)
+    else:
+        by_static_resources.move_to_end(key)
+
+    return simplified
@@ -3,7 +3,8 @@ from typing import Tuple, Set
 
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.game_patches import GamePatches
-from randovania.game_description.resources import merge_resources, ResourceDatabase, CurrentResources
+from randovania.game_description.resources import merge_resources, ResourceDatabase, CurrentResources, \
+    ResourceArray
 from randovania.layout.layout_configuration import LayoutConfiguration, LayoutTrickLevel
 from randovania.layout.starting_resources import StartingResourcesConfiguration
 from randovania.resolver import debug
@@ -148,6 +149,11 @@ def calculate_starting_state(logic: Logic, patches: GamePatches) -> "State":
     if initial_game_state is not None:
         add_resource_gain_to_current_resources(initial_game_state, initial_resources)
 
+    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
+    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
+    for resource in keys_to_remove:
+        del initial_resources[resource]
+
     starting_state = State(
         initial_resources,
         starting_node,
@@ -156,11 +162,6 @@ def calculate_starting_state(logic: Logic, patches: GamePatches) -> "State":
         game.resource_database
     )
 
-    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
-    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
-    for resource in keys_to_remove:
-        del initial_resources[resource]
-
     return starting_state
 
 
@@ -190,7 +191,8 @@ def logic_bootstrap(configuration: LayoutConfiguration,
     difficulty_level, static_resources = static_resources_for_layout_logic(configuration.trick_level,
                                                                            game.resource_database)
 
-    starting_state.resources = merge_resources(static_resources, starting_state.resources)
+    starting_state.resources = ResourceArray(game.resource_database,
+                                             merge_resources(static_resources, starting_state.resources))
     starting_state.resources[game.resource_database.difficulty_resource] = difficulty_level
 
     game.simplify_connections(starting_state.resources)
@@ -1,22 +1,34 @@
 import collections
+import contextlib
 import itertools
+import math
+import multiprocessing
+import multiprocessing.pool
+import threading
+import time
 from random import Random
-from typing import Tuple, Iterator, NamedTuple, Set, Union, Dict, FrozenSet, Callable
+from typing import Tuple, Iterator, NamedTuple, Set, Union, Dict, FrozenSet, Callable, List, Optional, Sequence
 
 from randovania.game_description.game_description import calculate_interesting_resources
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import ResourceNode, PickupNode, Node
 from randovania.game_description.requirements import RequirementList
-from randovania.game_description.resources import PickupEntry, PickupIndex, PickupAssignment, ResourceGain, ResourceInfo
+from randovania.game_description.resources import PickupEntry, PickupIndex, ResourceGain, ResourceInfo
 from randovania.resolver import debug
 from randovania.resolver.generator_reach import GeneratorReach, uncollected_resources, \
     advance_reach_with_possible_unsafe_resources, reach_with_all_safe_resources, \
-    get_uncollected_resource_nodes_of_reach, advance_to_with_reach_copy
+    get_uncollected_resource_nodes_of_reach, advance_to_with_reach_copies
 from randovania.resolver.logic import Logic
 from randovania.resolver.random_lib import iterate_with_weights
 from randovania.resolver.state import State, state_with_pickup
 
 
+# How many forked processes calculate the weights of the potential actions. With 0 or 1, they're calculated
+# in this process. The weights are the same either way.
+# The workers are forked once per filler run, only when the filler runs in the main thread.
+_WEIGHT_WORKERS = 0
+
+
 class UncollectedState(NamedTuple):
     indices: Set[PickupIndex]
     resources: Set[ResourceNode]
@@ -24,8 +36,7 @@ class UncollectedState(NamedTuple):
     @classmethod
     def from_reach(cls, reach: GeneratorReach) -> "UncollectedState":
         return UncollectedState(
-            set(_filter_unassigned_pickup_indices(reach.state.collected_pickup_indices,
-                                                  reach.state.patches.pickup_assignment)),
+            set(reach.state.collected_unassigned_pickup_indices),
             set(uncollected_resources(reach.connected_nodes, reach))
         )
 
@@ -44,12 +55,6 @@ def find_pickup_node_with_index(index: PickupIndex,
             return node
 
 
-def _calculate_reach_for_progression(reach: GeneratorReach,
-                                     progression: PickupEntry,
-                                     ) -> GeneratorReach:
-    return advance_to_with_reach_copy(reach, state_with_pickup(reach.state, progression))
-
-
 Action = Union[ResourceNode, PickupEntry]
 
 
@@ -62,15 +67,52 @@ def retcon_playthrough_filler(logic: Logic,
                               available_pickups: Tuple[PickupEntry, ...],
                               rng: Random,
                               status_update: Callable[[str], None],
+                              deadline: Optional[float] = None,
                               ) -> GamePatches:
+    """
+    :param logic:
+    :param initial_state:
+    :param available_pickups:
+    :param rng:
+    :param status_update:
+    :param deadline: If given, a time.monotonic() value after which TimeoutError is raised, checked on each step.
+    :return:
+    """
     debug.debug_print("Major items: {}".format([item.name for item in available_pickups]))
-    last_message = "Starting."
 
     reach = advance_reach_with_possible_unsafe_resources(reach_with_all_safe_resources(logic, initial_state))
 
+    weight_workers = None
+    if uses_weight_workers():
+        if threading.current_thread() is threading.main_thread():
+            weight_workers = _WeightWorkers(reach, available_pickups, _WEIGHT_WORKERS)
+        else:
+            debug.debug_print("Weight workers can only be forked from the main thread, calculating the weights here")
+
+    try:
+        return _retcon_playthrough_filler_loop(logic, reach, available_pickups, rng, status_update, deadline,
+                                               weight_workers)
+    finally:
+        if weight_workers is not None:
+            weight_workers.close()
+
+
+def _retcon_playthrough_filler_loop(logic: Logic,
+                                    reach: GeneratorReach,
+                                    available_pickups: Tuple[PickupEntry, ...],
+                                    rng: Random,
+                                    status_update: Callable[[str], None],
+                                    deadline: Optional[float],
+                                    weight_workers: Optional["_WeightWorkers"],
+                                    ) -> GamePatches:
+    last_message = "Starting."
     pickup_index_seen_count: Dict[PickupIndex, int] = collections.defaultdict(int)
 
     while True:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("Deadline reached after placing {} items.".format(
+                len(reach.state.patches.pickup_assignment)))
+
         current_uncollected = UncollectedState.from_reach(reach)
 
         pickups_left: Dict[str, PickupEntry] = {
@@ -93,7 +135,7 @@ def retcon_playthrough_filler(logic: Logic,
             status_update("{} {}".format(last_message, message))
 
         actions_weights = _calculate_potential_actions(reach, progression_pickups,
-                                                       current_uncollected, action_report)
+                                                       current_uncollected, action_report, weight_workers)
 
         try:
             action = next(iterate_with_weights(list(actions_weights.keys()), actions_weights, rng))
@@ -104,6 +146,7 @@ def retcon_playthrough_filler(logic: Logic,
                 raise RuntimeError("Unable to generate, no actions found after placing {} items.".format(
                     len(reach.state.patches.pickup_assignment)))
 
+        pickup_index = None
         if isinstance(action, PickupEntry):
             pickup_index_weight = {
                 pickup_index: 1 / (min(pickup_index_seen_count[pickup_index], 10) ** 2)
@@ -122,24 +165,19 @@ def retcon_playthrough_filler(logic: Logic,
 
             pickup_index = next(iterate_with_weights(list(current_uncollected.indices), pickup_index_weight, rng))
 
-            # TODO: this item is potentially dangerous and we should remove the invalidated paths
-            next_state = reach.state.assign_pickup_to_index(pickup_index, action)
-
             last_message = "Placed {} items so far, {} left.".format(
-                len(next_state.patches.pickup_assignment), len(pickups_left) - 1)
+                len(reach.state.patches.pickup_assignment) + 1, len(pickups_left) - 1)
             status_update(last_message)
             print_retcon_place_pickup(action, logic, pickup_index)
 
-            reach.advance_to(next_state)
-
         else:
             last_message = "Triggered an event out of {} options.".format(len(actions_weights))
             status_update(last_message)
             debug_print_collect_event(action, logic)
-            # This action is potentially dangerous. Use `act_on` to remove invalid paths
-            reach.act_on(action)
 
-        reach = advance_reach_with_possible_unsafe_resources(reach)
+        reach = _apply_action(reach, action, pickup_index)
+        if weight_workers is not None:
+            weight_workers.add_step(action, pickup_index)
 
         if logic.game.victory_condition.satisfied(reach.state.resources, reach.state.resource_database):
             debug.debug_print("Finished because we can win")
@@ -148,6 +186,24 @@ def retcon_playthrough_filler(logic: Logic,
     return reach.state.patches
 
 
+def _apply_action(reach: GeneratorReach, action: Action, pickup_index: Optional[PickupIndex]) -> GeneratorReach:
+    """
+    Changes the reach by placing the pickup of the action at the given index, or collecting the action's node.
+    :param reach:
+    :param action:
+    :param pickup_index: Where to place the pickup, when the action is a pickup.
+    :return: The reach after also collecting all resources that can be, which may be a new reach.
+    """
+    if isinstance(action, PickupEntry):
+        # TODO: this item is potentially dangerous and we should remove the invalidated paths
+        reach.advance_to(reach.state.assign_pickup_to_index(pickup_index, action))
+    else:
+        # This action is potentially dangerous. Use `act_on` to remove invalid paths
+        reach.act_on(action)
+
+    return advance_reach_with_possible_unsafe_resources(reach)
+
+
 def _calculate_progression_pickups(pickups_left: Dict[str, PickupEntry],
                                    reach: GeneratorReach,
                                    ) -> Tuple[PickupEntry, ...]:
@@ -200,10 +256,135 @@ def _calculate_weights_for(potential_reach: GeneratorReach,
     return weight
 
 
+def _states_for_actions(reach: GeneratorReach, actions: Sequence[Action]) -> List[State]:
+    return [
+        state_with_pickup(reach.state, action) if isinstance(action, PickupEntry) else reach.state.act_on_node(action)
+        for action in actions
+    ]
+
+
+def _weights_of_actions(reach: GeneratorReach,
+                        actions: Sequence[Action],
+                        states: Sequence[State],
+                        current_uncollected: UncollectedState,
+                        ) -> List[float]:
+    with contextlib.closing(advance_to_with_reach_copies(reach, states)) as potential_reaches:
+        return [
+            _calculate_weights_for(potential_reach, current_uncollected, action.name)
+            for action, potential_reach in zip(actions, potential_reaches)
+        ]
+
+
+# An encoded action: the position of the pickup in the available pickups, or the ordinal of the node to collect
+_EncodedAction = Tuple[bool, int]
+
+# The reach and available pickups of the filler in a forked worker, and how many of the filler's steps were applied
+_worker_reach: Optional[GeneratorReach] = None
+_worker_available_pickups: Tuple[PickupEntry, ...] = ()
+_worker_step_count = 0
+
+
+def _decode_action(reach: GeneratorReach,
+                   available_pickups: Tuple[PickupEntry, ...],
+                   encoded: _EncodedAction,
+                   ) -> Action:
+    is_pickup, value = encoded
+    if is_pickup:
+        return available_pickups[value]
+    return reach.logic.game.world_list.node_from_ordinal(value)
+
+
+def _worker_weights_of_chunk(task: Tuple[Tuple[Tuple[_EncodedAction, Optional[int]], ...],
+                                         List[_EncodedAction]]) -> List[float]:
+    """
+    Applies the filler's steps this worker hasn't applied yet to its reach, then calculates the weights of the given
+    actions from it.
+    :param task: All steps of the filler so far, with the pickup index of each placed pickup, and the actions.
+    :return:
+    """
+    global _worker_reach, _worker_step_count
+
+    steps, encoded_actions = task
+    for encoded, pickup_index in steps[_worker_step_count:]:
+        action = _decode_action(_worker_reach, _worker_available_pickups, encoded)
+        _worker_reach = _apply_action(_worker_reach, action,
+                                      PickupIndex(pickup_index) if pickup_index is not None else None)
+    _worker_step_count = len(steps)
+
+    reach = _worker_reach
+    actions = [_decode_action(reach, _worker_available_pickups, encoded) for encoded in encoded_actions]
+    return _weights_of_actions(reach, actions, _states_for_actions(reach, actions),
+                               UncollectedState.from_reach(reach))
+
+
+class _WeightWorkers:
+    """
+    A pool of processes forked once per filler run, that calculate the weights of potential actions.
+    Each process keeps its own copy of the filler's reach, inherited through the fork, and repeats the filler's
+    steps on it before calculating weights. Only the steps, the actions and the weights are sent between processes,
+    as positions and ordinals.
+    """
+
+    def __init__(self, reach: GeneratorReach, available_pickups: Tuple[PickupEntry, ...], workers: int):
+        global _worker_reach, _worker_available_pickups, _worker_step_count
+
+        self._world_list = reach.logic.game.world_list
+        self._available_pickups = available_pickups
+        self._workers = workers
+        self._steps: List[Tuple[_EncodedAction, Optional[int]]] = []
+
+        _worker_reach, _worker_available_pickups, _worker_step_count = reach, available_pickups, 0
+        try:
+            self._pool = multiprocessing.get_context("fork").Pool(workers)
+        finally:
+            _worker_reach, _worker_available_pickups = None, ()
+
+    def _encode_action(self, action: Action) -> _EncodedAction:
+        if isinstance(action, PickupEntry):
+            return True, self._available_pickups.index(action)
+        return False, self._world_list.node_to_ordinal(action)
+
+    def add_step(self, action: Action, pickup_index: Optional[PickupIndex]):
+        """
+        Records an action the filler applied to its reach, so the workers apply it to theirs.
+        :param action:
+        :param pickup_index:
+        :return:
+        """
+        self._steps.append((self._encode_action(action),
+                            pickup_index.index if pickup_index is not None else None))
+
+    def weights_of_actions(self, actions: Sequence[Action]) -> List[float]:
+        """
+        Same as _weights_of_actions for the filler's reach after all recorded steps, but split into chunks
+        calculated by the workers.
+        :param actions:
+        :return:
+        """
+        chunk_size = math.ceil(len(actions) / (self._workers * 4))
+        steps = tuple(self._steps)
+        tasks = [
+            (steps, [self._encode_action(action) for action in actions[start:start + chunk_size]])
+            for start in range(0, len(actions), chunk_size)
+        ]
+        weights_by_chunk = self._pool.map(_worker_weights_of_chunk, tasks, chunksize=1)
+        return list(itertools.chain.from_iterable(weights_by_chunk))
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def uses_weight_workers() -> bool:
+    return _WEIGHT_WORKERS > 1 and "fork" in multiprocessing.get_all_start_methods()
+
+
 def _calculate_potential_actions(reach: GeneratorReach,
                                  progression_pickups: Tuple[PickupEntry, ...],
                                  current_uncollected: UncollectedState,
-                                 status_update: Callable[[str], None]):
+                                 status_update: Callable[[str], None],
+                                 weight_workers: Optional[_WeightWorkers] = None,
+                                 ):
     actions_weights: Dict[Action, float] = {}
     uncollected_resource_nodes = get_uncollected_resource_nodes_of_reach(reach)
     total_options = len(uncollected_resource_nodes)
@@ -214,20 +395,21 @@ def _calculate_potential_actions(reach: GeneratorReach,
         options_considered += 1
         status_update("Checked {} of {} options.".format(options_considered, total_options))
 
+    actions = []
     if current_uncollected.indices:
         total_options += len(progression_pickups)
-        for progression in progression_pickups:
-            actions_weights[progression] = _calculate_weights_for(_calculate_reach_for_progression(reach,
-                                                                                                   progression),
-                                                                  current_uncollected,
-                                                                  progression.name) + progression.probability_offset
-            update_for_option()
-
-    for resource in uncollected_resource_nodes:
-        actions_weights[resource] = _calculate_weights_for(
-            advance_to_with_reach_copy(reach, reach.state.act_on_node(resource)),
-            current_uncollected,
-            resource.name)
+        actions.extend(progression_pickups)
+    actions.extend(uncollected_resource_nodes)
+
+    if weight_workers is not None and len(actions) > 1:
+        weights = weight_workers.weights_of_actions(actions)
+    else:
+        weights = _weights_of_actions(reach, actions, _states_for_actions(reach, actions), current_uncollected)
+
+    for action, weight in zip(actions, weights):
+        actions_weights[action] = weight
+        if isinstance(action, PickupEntry):
+            actions_weights[action] += action.probability_offset
         update_for_option()
 
     if debug.debug_level() > 1:
@@ -284,10 +466,3 @@ def print_new_pickup_indices(logic: Logic,
                     print([node.name for node in path])
         print("")
 
-
-def _filter_unassigned_pickup_indices(indices: Iterator[PickupIndex],
-                                      pickup_assignment: PickupAssignment,
-                                      ) -> Iterator[PickupIndex]:
-    for index in indices:
-        if index not in pickup_assignment:
-            yield index
@@ -1,4 +1,5 @@
 import multiprocessing.dummy
+import time
 from random import Random
 from typing import Tuple, Iterator, Optional, Callable, TypeVar, Union, List
 
@@ -15,44 +16,30 @@ from randovania.layout.starting_resources import StartingResourcesConfiguration
 from randovania.resolver import resolver
 from randovania.resolver.bootstrap import logic_bootstrap
 from randovania.resolver.exceptions import GenerationFailure
-from randovania.resolver.filler.retcon import retcon_playthrough_filler
+from randovania.resolver.filler.retcon import retcon_playthrough_filler, uses_weight_workers
 from randovania.resolver.filler_library import filter_unassigned_pickup_nodes
 from randovania.resolver.item_pool import calculate_item_pool, calculate_available_pickups
 from randovania.layout.layout_configuration import LayoutRandomizedFlag, LayoutSkyTempleKeyMode, LayoutConfiguration
 from randovania.layout.layout_description import LayoutDescription, SolverPath
 from randovania.layout.permalink import Permalink
 from randovania.resolver.random_lib import shuffle
-from randovania.resolver.state import State
+from randovania.resolver.resolver import ResolverStep
 
 T = TypeVar("T")
 
 
-def _iterate_previous_states(state: State) -> Iterator[State]:
-    while state:
-        yield state
-        state = state.previous_state
-
-
-def _state_to_solver_path(final_state: State,
+def _steps_to_solver_path(steps: Tuple[ResolverStep, ...],
                           game: GameDescription
                           ) -> Tuple[SolverPath, ...]:
     world_list = game.world_list
 
-    def build_previous_nodes(s: State):
-        if s.path_from_previous_state:
-            return tuple(
-                world_list.node_name(node) for node in s.path_from_previous_state
-                if node is not s.previous_state.node
-            )
-        else:
-            return tuple()
-
     return tuple(
         SolverPath(
-            node_name=world_list.node_name(state.node, with_world=True),
-            previous_nodes=build_previous_nodes(state)
+            node_name=world_list.node_name(world_list.node_from_ordinal(step.node), with_world=True),
+            previous_nodes=tuple(world_list.node_name(world_list.node_from_ordinal(node))
+                                 for node in step.previous_nodes)
         )
-        for state in reversed(list(_iterate_previous_states(final_state)))
+        for step in steps
     )
 
 
@@ -77,25 +64,36 @@ def generate_list(permalink: Permalink,
 
     new_patches = None
     final_state_by_resolve = None
+    resolver_steps = None
 
-    with multiprocessing.dummy.Pool(1) as dummy_pool:
-        patches_async = dummy_pool.apply_async(func=_create_patches,
-                                               kwds=create_patches_params)
+    if uses_weight_workers():
+        # The filler forks its weight workers, which isn't safe once the pool's threads are running.
+        # It runs in this thread instead, checking the timeout itself.
+        deadline = time.monotonic() + timeout if timeout is not None else None
         try:
-            new_patches = patches_async.get(timeout)
-        except multiprocessing.TimeoutError:
+            new_patches = _create_patches(**create_patches_params, deadline=deadline)
+        except TimeoutError:
             raise create_failure("Timeout reached when generating patches.")
 
+    with multiprocessing.dummy.Pool(1) as dummy_pool:
+        if new_patches is None:
+            patches_async = dummy_pool.apply_async(func=_create_patches,
+                                                   kwds=create_patches_params)
+            try:
+                new_patches = patches_async.get(timeout)
+            except multiprocessing.TimeoutError:
+                raise create_failure("Timeout reached when generating patches.")
+
         resolve_params = {
             "configuration": permalink.layout_configuration,
             "game": resolver_game,
             "patches": new_patches,
             "status_update": status_update,
         }
-        final_state_async = dummy_pool.apply_async(func=resolver.resolve,
+        final_state_async = dummy_pool.apply_async(func=resolver.resolve_with_steps,
                                                    kwds=resolve_params)
         try:
-            final_state_by_resolve = final_state_async.get(60)
+            final_state_by_resolve, resolver_steps = final_state_async.get(60)
         except multiprocessing.TimeoutError:
             raise create_failure("Timeout reached when validating possibility")
 
@@ -103,7 +101,7 @@ def generate_list(permalink: Permalink,
         # Why is final_state_by_distribution not OK?
         raise create_failure("Generated seed was considered impossible by the solver")
     else:
-        solver_path = _state_to_solver_path(final_state_by_resolve, resolver_game)
+        solver_path = _steps_to_solver_path(resolver_steps, resolver_game)
 
     return LayoutDescription(
         permalink=permalink,
@@ -232,6 +230,7 @@ def _create_patches(
         permalink: Permalink,
         game: GameDescription,
         status_update: Callable[[str], None],
+        deadline: Optional[float] = None,
 ) -> GamePatches:
     rng = Random(permalink.as_str)
     configuration = permalink.layout_configuration
@@ -248,7 +247,7 @@ def _create_patches(
     logic, state = logic_bootstrap(configuration, game, patches)
     logic.game.simplify_connections(state.resources)
 
-    filler_patches = retcon_playthrough_filler(logic, state, tuple(available_pickups), rng, status_update)
+    filler_patches = retcon_playthrough_filler(logic, state, tuple(available_pickups), rng, status_update, deadline)
 
     return filler_patches.assign_new_pickups(_indices_for_unassigned_pickups(rng,
                                                                              game,
@@ -1,12 +1,13 @@
 import copy
-from typing import Iterator, Optional, Set, Dict, List, NamedTuple, Tuple
-
-import networkx
+import functools
+from typing import Iterator, Optional, Set, Dict, List, NamedTuple, Tuple, Sequence, FrozenSet, Callable, Any
 
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import Node, is_resource_node, ResourceNode, PickupNode
-from randovania.game_description.requirements import RequirementSet, RequirementList
+from randovania.game_description.requirements import RequirementSet, RequirementList, satisfied_for_candidates
+from randovania.game_description.resources import SimpleResourceInfo, ResourceArray
 from randovania.resolver.logic import Logic
+from randovania.resolver.reach_graph import ReachGraph, IncrementalComponent, IncrementalCosts
 from randovania.resolver.state import State
 
 
@@ -15,16 +16,16 @@ class GraphPath(NamedTuple):
     node: Node
     requirements: RequirementSet
 
-    def is_in_graph(self, digraph: networkx.DiGraph):
+    def is_in_graph(self, digraph: ReachGraph):
         if self.previous_node is None:
             return False
         else:
-            return (self.previous_node, self.node) in digraph.edges
+            return digraph.has_edge(self.previous_node, self.node)
 
-    def add_to_graph(self, digraph: networkx.DiGraph):
+    def add_to_graph(self, digraph: ReachGraph):
         digraph.add_node(self.node)
         if self.previous_node is not None:
-            digraph.add_edge(self.previous_node, self.node, requirements=self.requirements)
+            digraph.add_edge(self.previous_node, self.node, self.requirements)
 
 
 def filter_resource_nodes(nodes: Iterator[Node]) -> Iterator[ResourceNode]:
@@ -60,15 +61,27 @@ def filter_out_dangerous_actions(resource_nodes: Iterator[ResourceNode],
 
 
 class GeneratorReach:
-    _digraph: networkx.DiGraph
+    __slots__ = ("_digraph", "_state", "_logic", "_reachable_costs", "_node_reachable_cache",
+                 "_unreachable_paths", "_unreachable_paths_by_resource", "_dangerous_edges", "_safe_component",
+                 "_nodes_that_can_reach", "_simplified_paths", "_simplified_resources", "_base", "_overlays",
+                 "_undo_log", "_checkpoint", "_unreachable_order_saved")
+    _digraph: ReachGraph
     _state: State
     _logic: Logic
-    _reachable_paths: Optional[Dict[Node, List[Node]]]
-    _reachable_costs: Optional[Dict[Node, int]]
+    _reachable_costs: Optional[IncrementalCosts]
     _node_reachable_cache: Dict[Node, bool]
     _unreachable_paths: Dict[Tuple[Node, Node], RequirementSet]
-    _safe_nodes: Optional[Set[Node]]
-    _is_node_safe_cache: Dict[Node, bool]
+    _unreachable_paths_by_resource: Dict[int, Set[Tuple[Node, Node]]]
+    _dangerous_edges: Dict[SimpleResourceInfo, Dict[Tuple[Node, Node], RequirementSet]]
+    _safe_component: Optional[IncrementalComponent]
+    _nodes_that_can_reach: Optional[Tuple[FrozenSet[Node], Set[Node]]]
+    _simplified_paths: Dict[Tuple[Node, Node], RequirementSet]
+    _simplified_resources: Optional[ResourceArray]
+    _base: Optional["GeneratorReach"]
+    _overlays: int
+    _undo_log: Optional[List[Callable[[], None]]]
+    _checkpoint: Optional[Dict[str, Any]]
+    _unreachable_order_saved: bool
 
     def __deepcopy__(self, memodict):
         reach = GeneratorReach(
@@ -77,27 +90,143 @@ class GeneratorReach:
             self._digraph.copy()
         )
         reach._unreachable_paths = copy.copy(self._unreachable_paths)
-        reach._reachable_paths = self._reachable_paths
-        reach._reachable_costs = self._reachable_costs
-        reach._safe_nodes = self._safe_nodes
+        reach._unreachable_paths_by_resource = {
+            ordinal: copy.copy(edges)
+            for ordinal, edges in self._unreachable_paths_by_resource.items()
+        }
+        reach._dangerous_edges = {
+            resource: copy.copy(edges)
+            for resource, edges in self._dangerous_edges.items()
+        }
+        if self._reachable_costs is not None:
+            reach._reachable_costs = self._reachable_costs.copy(reach._digraph)
+        if self._safe_component is not None:
+            reach._safe_component = self._safe_component.copy(reach._digraph)
 
         reach._node_reachable_cache = copy.copy(self._node_reachable_cache)
-        reach._is_node_safe_cache = copy.copy(self._is_node_safe_cache)
+        reach._nodes_that_can_reach = self._nodes_that_can_reach
+        reach._simplified_paths = copy.copy(self._simplified_paths)
+        reach._simplified_resources = self._simplified_resources
+        return reach
+
+    def overlay(self) -> "GeneratorReach":
+        """
+        Creates a reach equal to this one, that shares all data with this reach. The overlay changes the shared data
+        in place and logs each change, like after `begin`.
+        The overlay must then be either committed or discarded, and this reach can't change or have another overlay
+        until that happens.
+        :return:
+        """
+        assert self._undo_log is None, "Can't create an overlay between begin and rollback"
+        assert self._overlays == 0, "A reach can only have one overlay at a time"
+        reach = GeneratorReach(self._logic, self._state, self._digraph)
+        for slot in _OVERLAY_SLOTS:
+            setattr(reach, slot, getattr(self, slot))
+        reach.begin()
+        reach._base = self
+        self._overlays = 1
         return reach
 
+    def commit(self) -> None:
+        """
+        Makes the reach this is an overlay of equal to this one. This overlay must not be used afterwards.
+        :return:
+        """
+        base = self._base
+        assert base is not None, "Only an overlay can be committed"
+
+        self.end()
+        for slot in _CHECKPOINT_SLOTS:
+            setattr(base, slot, getattr(self, slot))
+        base._overlays = 0
+        self._base = None
+
+    def discard(self) -> None:
+        """
+        Undoes all changes of this overlay to the reach it is an overlay of. This overlay must not be used afterwards.
+        :return:
+        """
+        base = self._base
+        assert base is not None, "Only an overlay can be discarded"
+
+        self.rollback()
+        base._overlays = 0
+        self._base = None
+
+    def begin(self) -> None:
+        """
+        Starts logging how this reach changes, so `rollback` can undo these changes.
+        The graph and unreachable paths are changed in place, with each change logged, while the other calculated
+        data is replaced by a copy the first time it changes.
+        :return:
+        """
+        assert self._undo_log is None, "A reach can only have one checkpoint"
+        assert self._overlays == 0, "Can't begin while overlays are in use"
+        self._undo_log = []
+        self._checkpoint = {slot: getattr(self, slot) for slot in _CHECKPOINT_SLOTS}
+        self._unreachable_order_saved = False
+
+    def rollback(self) -> None:
+        """
+        Undoes all changes since the last `begin`.
+        :return:
+        """
+        undo_log = self._undo_log
+        assert undo_log is not None, "Rollback without begin"
+        self._undo_log = None
+        for undo in reversed(undo_log):
+            undo()
+
+        for slot, value in self._checkpoint.items():
+            setattr(self, slot, value)
+        self._checkpoint = None
+        self._unreachable_order_saved = False
+
+    def end(self) -> None:
+        """
+        Keeps all changes since the last `begin`, and stops logging.
+        :return:
+        """
+        assert self._undo_log is not None, "End without begin"
+        self._undo_log = None
+        self._checkpoint = None
+        self._unreachable_order_saved = False
+
+    def _writable(self, slot: str):
+        """
+        Gets the calculated data in the given slot, to be changed in place. Data saved by `begin` is copied first.
+        :param slot:
+        :return:
+        """
+        value = getattr(self, slot)
+        if self._checkpoint is not None and value is self._checkpoint[slot]:
+            value = value.copy(self._digraph)
+            setattr(self, slot, value)
+        return value
+
     def __init__(self,
                  logic: Logic,
                  state: State,
-                 graph: networkx.DiGraph
+                 graph: ReachGraph
                  ):
 
         self._logic = logic
         self._state = state
         self._digraph = graph
         self._unreachable_paths = {}
-        self._reachable_paths = None
+        self._unreachable_paths_by_resource = {}
+        self._dangerous_edges = {}
+        self._reachable_costs = None
         self._node_reachable_cache = {}
-        self._is_node_safe_cache = {}
+        self._safe_component = None
+        self._nodes_that_can_reach = None
+        self._simplified_paths = {}
+        self._simplified_resources = None
+        self._base = None
+        self._overlays = 0
+        self._undo_log = None
+        self._checkpoint = None
+        self._unreachable_order_saved = False
 
     @classmethod
     def reach_from_state(cls,
@@ -105,7 +234,7 @@ class GeneratorReach:
                          initial_state: State,
                          ) -> "GeneratorReach":
 
-        reach = cls(logic, initial_state, networkx.DiGraph())
+        reach = cls(logic, initial_state, ReachGraph(logic.game.world_list))
         reach._expand_graph([GraphPath(None, initial_state.node, RequirementSet.trivial())])
         return reach
 
@@ -126,22 +255,105 @@ class GeneratorReach:
 
     def _expand_graph(self, paths_to_check: List[GraphPath]):
         # print("!! _expand_graph", len(paths_to_check))
-        self._reachable_paths = None
+        has_dangerous_resources = bool(self._logic.game.dangerous_resources)
         while paths_to_check:
             path = paths_to_check.pop(0)
 
             if path.is_in_graph(self._digraph):
                 continue
 
+            if self._undo_log is not None:
+                if path.node not in self._digraph:
+                    self._undo_log.append(functools.partial(self._digraph.remove_node, path.node))
+                if path.previous_node is not None:
+                    self._undo_log.append(functools.partial(self._digraph.remove_edge, path.previous_node, path.node))
+
             path.add_to_graph(self._digraph)
+            if path.previous_node is not None:
+                self._nodes_that_can_reach = None
+                if has_dangerous_resources:
+                    for resource in path.requirements.dangerous_resources:
+                        self._add_dangerous_edge(resource, (path.previous_node, path.node), path.requirements)
+                if self._reachable_costs is not None:
+                    self._writable("_reachable_costs").add_edge(path.previous_node, path.node, self._is_blocked)
+                if self._safe_component is not None:
+                    self._writable("_safe_component").add_edge(path.previous_node, path.node)
 
             for target_node, requirements, satisfied in self._potential_nodes_from(path.node):
                 if satisfied:
                     paths_to_check.append(GraphPath(path.node, target_node, requirements))
                 else:
-                    self._unreachable_paths[path.node, target_node] = requirements
+                    self._add_unreachable_path((path.node, target_node), requirements)
 
-        self._safe_nodes = None
+    def _add_unreachable_path(self, edge: Tuple[Node, Node], requirements: RequirementSet):
+        # A path that's already unreachable keeps its position
+        previous = self._unreachable_paths.get(edge)
+        if previous is not None:
+            self._unindex_unreachable_path(edge, previous)
+
+        self._unreachable_paths[edge] = requirements
+        self._index_unreachable_path(edge, requirements)
+
+        if self._undo_log is not None:
+            if previous is None:
+                self._undo_log.append(functools.partial(self._remove_unreachable_path, edge))
+            else:
+                self._undo_log.append(functools.partial(self._add_unreachable_path, edge, previous))
+
+    def _remove_unreachable_path(self, edge: Tuple[Node, Node]):
+        if self._undo_log is not None and not self._unreachable_order_saved:
+            # Undoing the removals adds the paths back at the end, so the order is restored once everything after
+            # this point is undone
+            self._undo_log.append(functools.partial(self._restore_unreachable_order, dict(self._unreachable_paths)))
+            self._unreachable_order_saved = True
+
+        requirements = self._unreachable_paths.pop(edge)
+        self._unindex_unreachable_path(edge, requirements)
+        if self._undo_log is not None:
+            self._undo_log.append(functools.partial(self._restore_unreachable_path, edge, requirements))
+
+    def _restore_unreachable_path(self, edge: Tuple[Node, Node], requirements: RequirementSet):
+        self._unreachable_paths[edge] = requirements
+        self._index_unreachable_path(edge, requirements)
+
+    def _index_unreachable_path(self, edge: Tuple[Node, Node], requirements: RequirementSet):
+        for ordinal in requirements.resource_ordinals(self._state.resources.database):
+            self._unreachable_paths_by_resource.setdefault(ordinal, set()).add(edge)
+
+    def _unindex_unreachable_path(self, edge: Tuple[Node, Node], requirements: RequirementSet):
+        self._drop_simplified_path(edge)
+        for ordinal in requirements.resource_ordinals(self._state.resources.database):
+            self._unreachable_paths_by_resource[ordinal].discard(edge)
+
+    def _restore_unreachable_order(self, unreachable_paths: Dict[Tuple[Node, Node], RequirementSet]):
+        # Reordered in place, as an overlay shares this dict with its base
+        self._unreachable_paths.clear()
+        self._unreachable_paths.update(unreachable_paths)
+
+    def _set_simplified_path(self, edge: Tuple[Node, Node], requirements: RequirementSet):
+        previous = self._simplified_paths.get(edge)
+        self._simplified_paths[edge] = requirements
+        if self._undo_log is not None:
+            if previous is None:
+                self._undo_log.append(functools.partial(self._drop_simplified_path, edge))
+            else:
+                self._undo_log.append(functools.partial(self._set_simplified_path, edge, previous))
+
+    def _drop_simplified_path(self, edge: Tuple[Node, Node]):
+        previous = self._simplified_paths.pop(edge, None)
+        if self._undo_log is not None and previous is not None:
+            self._undo_log.append(functools.partial(self._set_simplified_path, edge, previous))
+
+    def _add_dangerous_edge(self, resource: SimpleResourceInfo, edge: Tuple[Node, Node],
+                            requirements: RequirementSet):
+        self._dangerous_edges.setdefault(resource, {})[edge] = requirements
+        if self._undo_log is not None:
+            self._undo_log.append(functools.partial(self._remove_dangerous_edge, resource, edge))
+
+    def _remove_dangerous_edge(self, resource: SimpleResourceInfo, edge: Tuple[Node, Node]):
+        requirements = self._dangerous_edges[resource].pop(edge, None)
+        if self._undo_log is not None and requirements is not None:
+            self._undo_log.append(functools.partial(self._add_dangerous_edge, resource, edge, requirements))
 
     def _can_advance(self,
                      node: Node,
@@ -157,26 +369,20 @@ class GeneratorReach:
         else:
             return True
 
+    def _is_blocked(self, node: Node) -> bool:
+        return not self._can_advance(node)
+
     def _calculate_safe_nodes(self):
-        if self._safe_nodes is not None:
+        if self._safe_component is not None:
             return
 
-        self._connected_components = list(networkx.strongly_connected_components(self._digraph))
-        for component in self._connected_components:
-            if self._state.node in component:
-                assert self._safe_nodes is None
-                self._safe_nodes = component
-
-        assert self._safe_nodes is not None
+        self._safe_component = IncrementalComponent(self._digraph, self._state.node)
 
     def _calculate_reachable_paths(self):
-        if self._reachable_paths is not None:
+        if self._reachable_costs is not None:
             return
 
-        self._reachable_costs, self._reachable_paths = networkx.multi_source_dijkstra(
-            self._digraph,
-            {self.state.node},
-            weight=lambda source, target, attributes: 0 if self._can_advance(target) else 1)
+        self._reachable_costs = IncrementalCosts(self._digraph, self.state.node, self._is_blocked)
 
     def is_reachable_node(self, node: Node) -> bool:
         cached_value = self._node_reachable_cache.get(node)
@@ -205,7 +411,7 @@ class GeneratorReach:
         :return:
         """
         self._calculate_reachable_paths()
-        for node in self._reachable_paths.keys():
+        for node in self._reachable_costs:
             yield node
 
     @property
@@ -228,49 +434,106 @@ class GeneratorReach:
                 yield node
 
     def is_safe_node(self, node: Node) -> bool:
-        is_safe = self._is_node_safe_cache.get(node)
-        if is_safe is not None:
-            return is_safe
-
         self._calculate_safe_nodes()
-        self._is_node_safe_cache[node] = node in self._safe_nodes
-        return self._is_node_safe_cache[node]
+        return node in self._safe_component
+
+    def _unreachable_paths_to_check(self, new_state: State) -> Set[Tuple[Node, Node]]:
+        """
+        Only the paths that depend on a resource that changed can be satisfied by the new state.
+        When the resources of the current state were changed in place, there's nothing to compare against, so all
+        paths are checked.
+        :param new_state:
+        :return:
+        """
+        if new_state.resources is self._state.resources:
+            return set(self._unreachable_paths)
+
+        edges_to_check = set()
+        for ordinal in self._state.resources.changed_ordinals(new_state.resources):
+            edges_to_check.update(self._unreachable_paths_by_resource.get(ordinal, ()))
+        return edges_to_check
+
+    def satisfied_unreachable_paths(self, states: Sequence[State]) -> List[Set[Tuple[Node, Node]]]:
+        """
+        Calculates which unreachable paths advance_to would add, for each of the given states.
+        The requirements of all states are checked together.
+        :param states:
+        :return: For each state, the paths that can be used as `satisfied_paths` for advance_to.
+        """
+        edges_to_check = [self._unreachable_paths_to_check(state) for state in states]
+        edges = list(set().union(*edges_to_check))
+        satisfied = satisfied_for_candidates([self._unreachable_paths[edge] for edge in edges],
+                                             [state.resources for state in states],
+                                             self._state.resource_database)
+
+        return [
+            {edge for edge, candidates in zip(edges, satisfied) if (candidates >> i) & 1 and edge in state_edges}
+            for i, state_edges in enumerate(edges_to_check)
+        ]
 
     def advance_to(self, new_state: State,
                    is_safe: bool = False,
+                   satisfied_paths: Optional[Set[Tuple[Node, Node]]] = None,
                    ) -> None:
+        """
+        Changes the state of this reach, adding all unreachable paths that are now satisfied.
+        :param new_state:
+        :param is_safe: If it's known the new state is in a safe node.
+        :param satisfied_paths: The unreachable paths satisfied by the new state, as calculated by
+        satisfied_unreachable_paths. If None, these are checked here.
+        :return:
+        """
         assert new_state.previous_state == self.state
+        assert self._overlays == 0, "Can't change a reach while its overlays are in use"
         # assert self.is_reachable_node(new_state.node)
 
         if is_safe or self.is_safe_node(new_state.node):
-            for node, _ in list(filter(lambda x: not x[1], self._node_reachable_cache.items())):
-                del self._node_reachable_cache[node]
+            if self._checkpoint is not None and self._node_reachable_cache is self._checkpoint["_node_reachable_cache"]:
+                self._node_reachable_cache = {node: True for node, reachable in self._node_reachable_cache.items()
+                                              if reachable}
+            else:
+                for node, _ in list(filter(lambda x: not x[1], self._node_reachable_cache.items())):
+                    del self._node_reachable_cache[node]
 
-            for node, _ in list(filter(lambda x: not x[1], self._is_node_safe_cache.items())):
-                del self._is_node_safe_cache[node]
+            # The new node is in the same component, so it's kept up to date as the graph expands
+            if self._safe_component is not None:
+                self._writable("_safe_component").move_root(new_state.node)
         else:
             self._node_reachable_cache = {}
-            self._is_node_safe_cache = {}
+            self._safe_component = None
 
+        if satisfied_paths is None:
+            edges_to_check = self._unreachable_paths_to_check(new_state)
+        else:
+            edges_to_check = satisfied_paths
         self._state = new_state
 
+        if self._reachable_costs is not None:
+            reachable_costs = self._writable("_reachable_costs")
+            reachable_costs.unblock_nodes(self._is_blocked)
+            if not reachable_costs.move_root(new_state.node, self._is_blocked):
+                self._reachable_costs = None
+
         paths_to_check: List[GraphPath] = []
 
         edges_to_remove = []
         # Check if we can expand the corners of our graph
-        # TODO: check if expensive. We filter by only nodes that depends on a new resource
-        for edge, requirements in self._unreachable_paths.items():
-            if requirements.satisfied(self._state.resources, self._state.resource_database):
-                from_node, to_node = edge
-                paths_to_check.append(GraphPath(from_node, to_node, requirements))
-                edges_to_remove.append(edge)
+        if edges_to_check:
+            for edge, requirements in self._unreachable_paths.items():
+                if edge in edges_to_check and (satisfied_paths is not None
+                                               or requirements.satisfied(self._state.resources,
+                                                                         self._state.resource_database)):
+                    from_node, to_node = edge
+                    paths_to_check.append(GraphPath(from_node, to_node, requirements))
+                    edges_to_remove.append(edge)
 
         for edge in edges_to_remove:
-            del self._unreachable_paths[edge]
+            self._remove_unreachable_path(edge)
 
         self._expand_graph(paths_to_check)
 
     def act_on(self, node: ResourceNode) -> None:
+        assert self._overlays == 0, "Can't change a reach while its overlays are in use"
         new_dangerous_resources = set(
             resource
             for resource, quantity in node.resource_gain_on_collect(self.state.patches)
@@ -279,29 +542,83 @@ class GeneratorReach:
         new_state = self.state.act_on_node(node)
 
         if new_dangerous_resources:
-            edges_to_remove = []
-            for source, target, attributes in self._digraph.edges.data():
-                requirements: RequirementSet = attributes["requirements"]
-                dangerous = requirements.dangerous_resources
-                if dangerous and new_dangerous_resources.intersection(dangerous):
-                    if not requirements.satisfied(new_state.resources, new_state.resource_database):
-                        edges_to_remove.append((source, target))
+            edges_to_check = {}
+            for resource in new_dangerous_resources:
+                edges_to_check.update(self._dangerous_edges.get(resource, {}))
+
+            edges_to_remove = [
+                edge
+                for edge, requirements in edges_to_check.items()
+                if not requirements.satisfied(new_state.resources, new_state.resource_database)
+            ]
 
             for edge in edges_to_remove:
+                requirements = edges_to_check[edge]
+                for resource in requirements.dangerous_resources:
+                    self._remove_dangerous_edge(resource, edge)
                 self._digraph.remove_edge(*edge)
+                if self._undo_log is not None:
+                    self._undo_log.append(functools.partial(self._digraph.add_edge, *edge, requirements))
+                if self._safe_component is not None:
+                    self._writable("_safe_component").remove_edge(*edge)
+            if edges_to_remove:
+                self._reachable_costs = None
+                self._nodes_that_can_reach = None
 
         self.advance_to(new_state)
 
+    def nodes_that_can_reach(self, targets: FrozenSet[Node]) -> Set[Node]:
+        """
+        Calculates all nodes with a path to any of the given nodes. The result for the last targets is kept until the
+        graph changes.
+        :param targets:
+        :return: The nodes found, including the targets in the graph.
+        """
+        cached = self._nodes_that_can_reach
+        if cached is None or cached[0] != targets:
+            cached = self._nodes_that_can_reach = (targets, self._digraph.nodes_reaching(targets))
+        return cached[1]
+
     def shortest_path_from(self, node: Node) -> Dict[Node, Tuple[Node, ...]]:
         if node in self._digraph:
-            return networkx.shortest_path(self._digraph, node)
+            return self._digraph.shortest_paths_from(node)
         else:
             return {}
 
+    def _invalidate_simplified_paths(self):
+        """
+        Drops the simplified requirements of the unreachable paths that depend on a resource that changed since they
+        were simplified.
+        :return:
+        """
+        resources = self.state.resources
+        previous = self._simplified_resources
+        if previous is not None:
+            # Simplifying also depends on which resources are present, even with an amount of 0
+            changed = set(previous.changed_ordinals(resources))
+            changed.update(previous.changed_presence_ordinals(resources))
+            for ordinal in changed:
+                for edge in self._unreachable_paths_by_resource.get(ordinal, ()):
+                    self._drop_simplified_path(edge)
+        self._simplified_resources = resources.copy()
+
     def unreachable_nodes_with_requirements(self) -> Dict[Node, RequirementSet]:
+        """
+        The requirements to reach each node of an unreachable path, simplified by the current resources.
+        The simplified requirements of each path are kept until one of the resources they depend on changes.
+        :return:
+        """
+        self._invalidate_simplified_paths()
+        simplified_paths = self._simplified_paths
+
         results = {}
-        for (_, node), requirements in self._unreachable_paths.items():
-            requirements = requirements.simplify(self.state.resources, self.logic.game.resource_database)
+        for edge, requirements in self._unreachable_paths.items():
+            node = edge[1]
+            if edge in simplified_paths:
+                requirements = simplified_paths[edge]
+            else:
+                requirements = requirements.simplify(self.state.resources, self.logic.game.resource_database)
+                self._set_simplified_path(edge, requirements)
             if node in results:
                 results[node] = results[node].expand_alternatives(requirements)
             else:
@@ -309,6 +626,16 @@ class GeneratorReach:
         return results
 
 
+# The slots saved by begin, that are replaced instead of changed in place
+_CHECKPOINT_SLOTS = ("_state", "_reachable_costs", "_node_reachable_cache", "_safe_component", "_nodes_that_can_reach",
+                     "_simplified_resources")
+
+# The slots an overlay shares with its base
+_OVERLAY_SLOTS = ("_digraph", "_state", "_reachable_costs", "_node_reachable_cache", "_unreachable_paths",
+                  "_unreachable_paths_by_resource", "_dangerous_edges", "_safe_component", "_nodes_that_can_reach",
+                  "_simplified_paths", "_simplified_resources")
+
+
 def _extra_requirement_for_node(game: GameDescription, node: Node) -> Optional[RequirementSet]:
     extra_requirement = None
 
@@ -371,9 +698,11 @@ def reach_with_all_safe_resources(logic: Logic, initial_state: State) -> Generat
 
 def advance_reach_with_possible_unsafe_resources(previous_reach: GeneratorReach) -> GeneratorReach:
     """
-    Create a new GeneratorReach that collected actions not considered safe, but expanded the safe_nodes set
-    :param previous_reach:
-    :return:
+    Collects actions not considered safe, but that expanded the safe_nodes set.
+    The given reach is modified in place: all its safe resources are collected, and the unsafe actions that were kept
+    are applied to it. Callers must not rely on its previous contents, and should use the returned reach instead.
+    :param previous_reach: The reach to advance. It's consumed by this function.
+    :return: Either the given reach, advanced, or a new reach when going back to the initial node required one.
     """
 
     logic = previous_reach.logic
@@ -383,25 +712,27 @@ def advance_reach_with_possible_unsafe_resources(previous_reach: GeneratorReach)
     previous_safe_nodes = set(previous_reach.safe_nodes)
 
     for action in get_uncollected_resource_nodes_of_reach(previous_reach):
-        # print("Trying to collect {} and it's not dangerous. Copying...".format(action.name))
-        next_reach = copy.deepcopy(previous_reach)
-        next_reach.act_on(action)
-        collect_all_safe_resources_in_reach(next_reach)
+        # print("Trying to collect {} and it's not dangerous. Rolling back if not good...".format(action.name))
+        previous_reach.begin()
+        previous_reach.act_on(action)
+        collect_all_safe_resources_in_reach(previous_reach)
 
-        if previous_safe_nodes <= set(next_reach.safe_nodes):
+        if previous_safe_nodes <= set(previous_reach.safe_nodes):
             # print("Non-safe {} was good".format(logic.game.node_name(action)))
-            return advance_reach_with_possible_unsafe_resources(next_reach)
+            previous_reach.end()
+            return advance_reach_with_possible_unsafe_resources(previous_reach)
 
-        if next_reach.is_reachable_node(initial_state.node):
-            next_next_state = next_reach.state.copy()
+        if previous_reach.is_reachable_node(initial_state.node):
+            next_next_state = previous_reach.state.copy()
             next_next_state.node = initial_state.node
+            previous_reach.rollback()
 
             next_reach = reach_with_all_safe_resources(logic, next_next_state)
             if previous_safe_nodes <= set(next_reach.safe_nodes):
                 # print("Non-safe {} could reach back to where we were".format(logic.game.node_name(action)))
                 return advance_reach_with_possible_unsafe_resources(next_reach)
         else:
-            pass
+            previous_reach.rollback()
 
     # We couldn't improve this reach, so just return it
     return previous_reach
@@ -410,8 +741,9 @@ def advance_reach_with_possible_unsafe_resources(previous_reach: GeneratorReach)
 def pickup_nodes_that_can_reach(pickup_nodes: Iterator[PickupNode],
                                 reach: GeneratorReach,
                                 safe_nodes: Set[Node]) -> Iterator[PickupNode]:
+    safe_nodes = frozenset(safe_nodes)
     for pickup_node in pickup_nodes:
-        if pickup_node in safe_nodes or set(reach.shortest_path_from(pickup_node).keys()).intersection(safe_nodes):
+        if pickup_node in safe_nodes or pickup_node in reach.nodes_that_can_reach(safe_nodes):
             yield pickup_node
 
 
@@ -427,3 +759,30 @@ def advance_to_with_reach_copy(base_reach: GeneratorReach, state: State) -> Gene
     collect_all_safe_resources_in_reach(potential_reach)
     return potential_reach
     # return advance_reach_with_possible_unsafe_resources(potential_reach, patches)
+
+
+def advance_to_with_reach_copies(base_reach: GeneratorReach, states: Sequence[State]) -> Iterator[GeneratorReach]:
+    """
+    Same as advance_to_with_reach_copy for each of the given states, but the unreachable paths of the base reach are
+    checked for all states at once.
+    Each reach is an overlay of the base reach, so the base reach must not be used until the iteration ends.
+    An overlay is only valid until the next one is requested: any overlay still outstanding at that point, or when the
+    iteration ends or is closed, is discarded here. Committing an overlay ends the iteration, since the remaining
+    states were checked against the previous base reach.
+    :param base_reach:
+    :param states:
+    :return:
+    """
+    base_state = base_reach.state
+    for state, satisfied_paths in zip(states, base_reach.satisfied_unreachable_paths(states)):
+        potential_reach = base_reach.overlay()
+        try:
+            potential_reach.advance_to(state, satisfied_paths=satisfied_paths)
+            collect_all_safe_resources_in_reach(potential_reach)
+            yield potential_reach
+        finally:
+            if potential_reach._base is not None:
+                potential_reach.discard()
+
+        if base_reach.state is not base_state:
+            return
@@ -0,0 +1,485 @@
+import collections
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from randovania.game_description.node import Node
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.world_list import WorldList
+
+
+class ReachGraph:
+    """
+    A directed graph over the nodes of a WorldList, with a RequirementSet for each edge.
+    Nodes are stored by their ordinal in the WorldList, with the successors and predecessors of each node in lists
+    indexed by ordinal. Nodes and edges are iterated in insertion order.
+    """
+    __slots__ = ("world_list", "_nodes", "_successors", "_predecessors")
+    world_list: WorldList
+    _nodes: Dict[int, None]
+    _successors: List[Optional[Dict[int, RequirementSet]]]
+    _predecessors: List[Optional[Dict[int, None]]]
+
+    def __init__(self, world_list: WorldList):
+        self.world_list = world_list
+        self._nodes = {}
+        self._successors = [None] * world_list.node_count
+        self._predecessors = [None] * world_list.node_count
+
+    def copy(self) -> "ReachGraph":
+        result = ReachGraph.__new__(ReachGraph)
+        result.world_list = self.world_list
+        result._nodes = dict(self._nodes)
+        result._successors = [None if successors is None else dict(successors)
+                              for successors in self._successors]
+        result._predecessors = [None if predecessors is None else dict(predecessors)
+                                for predecessors in self._predecessors]
+        return result
+
+    def __contains__(self, node: Node) -> bool:
+        return self.world_list.node_to_ordinal(node) in self._nodes
+
+    def __iter__(self) -> Iterator[Node]:
+        node_from_ordinal = self.world_list.node_from_ordinal
+        for ordinal in self._nodes:
+            yield node_from_ordinal(ordinal)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _add_ordinal(self, ordinal: int):
+        if ordinal not in self._nodes:
+            self._nodes[ordinal] = None
+            self._successors[ordinal] = {}
+            self._predecessors[ordinal] = {}
+
+    def add_node(self, node: Node):
+        self._add_ordinal(self.world_list.node_to_ordinal(node))
+
+    def remove_node(self, node: Node):
+        """
+        Removes a node that has no edges.
+        :param node:
+        :return:
+        """
+        ordinal = self.world_list.node_to_ordinal(node)
+        assert not self._successors[ordinal] and not self._predecessors[ordinal]
+        del self._nodes[ordinal]
+        self._successors[ordinal] = None
+        self._predecessors[ordinal] = None
+
+    def has_edge(self, source: Node, target: Node) -> bool:
+        successors = self._successors[self.world_list.node_to_ordinal(source)]
+        return successors is not None and self.world_list.node_to_ordinal(target) in successors
+
+    def add_edge(self, source: Node, target: Node, requirements: RequirementSet):
+        """
+        Adds an edge between the given nodes, adding the nodes if needed.
+        If the edge already exists, only the requirements are replaced.
+        :param source:
+        :param target:
+        :param requirements:
+        :return:
+        """
+        source_ordinal = self.world_list.node_to_ordinal(source)
+        target_ordinal = self.world_list.node_to_ordinal(target)
+        self._add_ordinal(source_ordinal)
+        self._add_ordinal(target_ordinal)
+        self._successors[source_ordinal][target_ordinal] = requirements
+        self._predecessors[target_ordinal][source_ordinal] = None
+
+    def remove_edge(self, source: Node, target: Node):
+        source_ordinal = self.world_list.node_to_ordinal(source)
+        target_ordinal = self.world_list.node_to_ordinal(target)
+        del self._successors[source_ordinal][target_ordinal]
+        del self._predecessors[target_ordinal][source_ordinal]
+
+    def edges(self) -> Iterator[Tuple[Node, Node, RequirementSet]]:
+        node_from_ordinal = self.world_list.node_from_ordinal
+        for source in self._nodes:
+            for target, requirements in self._successors[source].items():
+                yield node_from_ordinal(source), node_from_ordinal(target), requirements
+
+    def costs_from(self, source: Node, is_blocked: Callable[[Node], bool]) -> Dict[Node, int]:
+        """
+        Calculates the lowest cost of going from source to each node it can reach, using a 0-1 BFS.
+        Moving into a blocked node costs 1, and into any other node costs 0.
+        :param source:
+        :param is_blocked: Called once for each node in the graph.
+        :return:
+        """
+        node_from_ordinal = self.world_list.node_from_ordinal
+        blocked = {ordinal for ordinal in self._nodes if is_blocked(node_from_ordinal(ordinal))}
+        successors = self._successors
+
+        start = self.world_list.node_to_ordinal(source)
+        costs = {start: 0}
+        queue = collections.deque([start])
+
+        while queue:
+            current = queue.popleft()
+            cost = costs[current]
+            for target in successors[current]:
+                if target in blocked:
+                    target_cost = cost + 1
+                    if target_cost < costs.get(target, target_cost + 1):
+                        costs[target] = target_cost
+                        queue.append(target)
+                elif cost < costs.get(target, cost + 1):
+                    costs[target] = cost
+                    queue.appendleft(target)
+
+        return {node_from_ordinal(ordinal): cost for ordinal, cost in costs.items()}
+
+    def strongly_connected_component(self, node: Node) -> Set[Node]:
+        """
+        Calculates the strongly connected component that contains the given node, using an iterative Tarjan's
+        algorithm over the nodes reachable from it.
+        :param node:
+        :return:
+        """
+        successors = self._successors
+        start = self.world_list.node_to_ordinal(node)
+
+        index = {start: 0}
+        low_link = {start: 0}
+        stack = [start]
+        on_stack = {start}
+        to_visit = [(start, iter(successors[start]))]
+
+        while to_visit:
+            current, children = to_visit[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low_link[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    to_visit.append((child, iter(successors[child])))
+                    break
+                elif child in on_stack and index[child] < low_link[current]:
+                    low_link[current] = index[child]
+            else:
+                to_visit.pop()
+                if to_visit:
+                    parent = to_visit[-1][0]
+                    if low_link[current] < low_link[parent]:
+                        low_link[parent] = low_link[current]
+
+                if low_link[current] == index[current]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.add(member)
+                        if member == current:
+                            break
+
+                    if current == start:
+                        node_from_ordinal = self.world_list.node_from_ordinal
+                        return {node_from_ordinal(ordinal) for ordinal in component}
+
+        raise RuntimeError("Tarjan's algorithm finished without the component of the starting node")
+
+    def nodes_reaching(self, targets: Iterable[Node]) -> Set[Node]:
+        """
+        Calculates all nodes with a path to any of the given nodes, using a single reverse BFS from all of them.
+        :param targets: Nodes not in the graph are ignored.
+        :return: The nodes found, including the targets in the graph.
+        """
+        node_to_ordinal = self.world_list.node_to_ordinal
+        predecessors = self._predecessors
+
+        reached = {node_to_ordinal(node) for node in targets}
+        reached.intersection_update(self._nodes)
+        queue = collections.deque(reached)
+        while queue:
+            for source in predecessors[queue.popleft()]:
+                if source not in reached:
+                    reached.add(source)
+                    queue.append(source)
+
+        node_from_ordinal = self.world_list.node_from_ordinal
+        return {node_from_ordinal(ordinal) for ordinal in reached}
+
+    def shortest_paths_from(self, source: Node) -> Dict[Node, List[Node]]:
+        """
+        Calculates a path with the fewest edges from source to each node it can reach, using a BFS.
+        :param source:
+        :return: For each node, the list of nodes in the path, starting with source and ending with that node.
+        """
+        successors = self._successors
+        start = self.world_list.node_to_ordinal(source)
+
+        parents = {start: None}
+        queue = collections.deque([start])
+        while queue:
+            current = queue.popleft()
+            for target in successors[current]:
+                if target not in parents:
+                    parents[target] = current
+                    queue.append(target)
+
+        node_from_ordinal = self.world_list.node_from_ordinal
+        paths = {}
+        for ordinal, parent in parents.items():
+            node = node_from_ordinal(ordinal)
+            if parent is None:
+                paths[node] = [node]
+            else:
+                paths[node] = paths[node_from_ordinal(parent)] + [node]
+        return paths
+
+
+class IncrementalComponent:
+    """
+    The strongly connected component of a root node in a ReachGraph, kept up to date as edges are added and removed.
+    The component is the intersection of the nodes reachable from the root and the nodes that can reach the root.
+    Adding an edge only visits the nodes that it makes reachable in either direction, while removing an edge
+    recalculates a direction only if the edge was part of it.
+    """
+    __slots__ = ("graph", "_root", "_forward", "_backward", "_component")
+    graph: ReachGraph
+    _root: int
+    _forward: Set[int]
+    _backward: Set[int]
+    _component: Set[int]
+
+    def __init__(self, graph: ReachGraph, root: Node):
+        self.graph = graph
+        self._root = graph.world_list.node_to_ordinal(root)
+        self._forward = self._reached_from(graph._successors, self._root)
+        self._backward = self._reached_from(graph._predecessors, self._root)
+        self._component = self._forward & self._backward
+
+    def copy(self, graph: ReachGraph) -> "IncrementalComponent":
+        """
+        Copies this component, for a copy of the graph it was created for.
+        :param graph:
+        :return:
+        """
+        result = IncrementalComponent.__new__(IncrementalComponent)
+        result.graph = graph
+        result._root = self._root
+        result._forward = set(self._forward)
+        result._backward = set(self._backward)
+        result._component = set(self._component)
+        return result
+
+    def __contains__(self, node: Node) -> bool:
+        return self.graph.world_list.node_to_ordinal(node) in self._component
+
+    def __iter__(self) -> Iterator[Node]:
+        node_from_ordinal = self.graph.world_list.node_from_ordinal
+        for ordinal in self._component:
+            yield node_from_ordinal(ordinal)
+
+    def __len__(self) -> int:
+        return len(self._component)
+
+    def move_root(self, node: Node):
+        """
+        Changes the root to another node of the component. Both have the same component, so nothing is recalculated.
+        :param node:
+        :return:
+        """
+        ordinal = self.graph.world_list.node_to_ordinal(node)
+        assert ordinal in self._component
+        self._root = ordinal
+
+    @staticmethod
+    def _reached_from(adjacency: List[Optional[Dict[int, object]]], start: int) -> Set[int]:
+        reached = {start}
+        to_visit = [start]
+        while to_visit:
+            for neighbour in adjacency[to_visit.pop()]:
+                if neighbour not in reached:
+                    reached.add(neighbour)
+                    to_visit.append(neighbour)
+        return reached
+
+    def _extend(self, adjacency: List[Optional[Dict[int, object]]], reached: Set[int], other: Set[int], start: int):
+        reached.add(start)
+        to_visit = [start]
+        while to_visit:
+            current = to_visit.pop()
+            if current in other:
+                self._component.add(current)
+            for neighbour in adjacency[current]:
+                if neighbour not in reached:
+                    reached.add(neighbour)
+                    to_visit.append(neighbour)
+
+    def add_edge(self, source: Node, target: Node):
+        """
+        Updates the component after the given edge was added to the graph.
+        :param source:
+        :param target:
+        :return:
+        """
+        source_ordinal = self.graph.world_list.node_to_ordinal(source)
+        target_ordinal = self.graph.world_list.node_to_ordinal(target)
+
+        if source_ordinal in self._forward and target_ordinal not in self._forward:
+            self._extend(self.graph._successors, self._forward, self._backward, target_ordinal)
+
+        if target_ordinal in self._backward and source_ordinal not in self._backward:
+            self._extend(self.graph._predecessors, self._backward, self._forward, source_ordinal)
+
+    def remove_edge(self, source: Node, target: Node):
+        """
+        Updates the component after the given edge was removed from the graph.
+        :param source:
+        :param target:
+        :return:
+        """
+        source_ordinal = self.graph.world_list.node_to_ordinal(source)
+        target_ordinal = self.graph.world_list.node_to_ordinal(target)
+        changed = False
+
+        if source_ordinal in self._forward and target_ordinal in self._forward:
+            self._forward = self._reached_from(self.graph._successors, self._root)
+            changed = True
+
+        if source_ordinal in self._backward and target_ordinal in self._backward:
+            self._backward = self._reached_from(self.graph._predecessors, self._root)
+            changed = True
+
+        if changed:
+            self._component = self._forward & self._backward
+
+
+class IncrementalCosts:
+    """
+    The lowest costs of going from a root node to each node of a ReachGraph, the same as ReachGraph.costs_from,
+    kept up to date as edges are added and blocked nodes become unblocked.
+    Both only lower costs, so these are propagated from the changed nodes instead of recalculating everything.
+    Whether a node is blocked is only checked when it's first reached, or by `unblock_nodes` for blocked nodes.
+    Changes that might raise a cost, such as removing an edge, need a new IncrementalCosts.
+    """
+    __slots__ = ("graph", "_root", "_costs", "_blocked")
+    graph: ReachGraph
+    _root: int
+    _costs: Dict[int, int]
+    _blocked: Dict[int, bool]
+
+    def __init__(self, graph: ReachGraph, root: Node, is_blocked: Callable[[Node], bool]):
+        self.graph = graph
+        self._root = graph.world_list.node_to_ordinal(root)
+        self._costs = {self._root: 0}
+        self._blocked = {}
+        self._propagate(collections.deque([self._root]), is_blocked)
+
+    def copy(self, graph: ReachGraph) -> "IncrementalCosts":
+        """
+        Copies these costs, for a copy of the graph they were created for.
+        :param graph:
+        :return:
+        """
+        result = IncrementalCosts.__new__(IncrementalCosts)
+        result.graph = graph
+        result._root = self._root
+        result._costs = dict(self._costs)
+        result._blocked = dict(self._blocked)
+        return result
+
+    def get(self, node: Node) -> Optional[int]:
+        return self._costs.get(self.graph.world_list.node_to_ordinal(node))
+
+    def __iter__(self) -> Iterator[Node]:
+        node_from_ordinal = self.graph.world_list.node_from_ordinal
+        for ordinal in self._costs:
+            yield node_from_ordinal(ordinal)
+
+    def _weight(self, ordinal: int, is_blocked: Callable[[Node], bool]) -> int:
+        blocked = self._blocked.get(ordinal)
+        if blocked is None:
+            blocked = self._blocked[ordinal] = is_blocked(self.graph.world_list.node_from_ordinal(ordinal))
+        return 1 if blocked else 0
+
+    def _propagate(self, queue: collections.deque, is_blocked: Callable[[Node], bool]):
+        """
+        Lowers the costs of the successors of the nodes in the queue, until no cost changes.
+        :param queue: Nodes with a lowered cost.
+        :param is_blocked:
+        :return:
+        """
+        successors = self.graph._successors
+        costs = self._costs
+
+        while queue:
+            current = queue.popleft()
+            cost = costs[current]
+            for target in successors[current]:
+                target_cost = cost + self._weight(target, is_blocked)
+                if target_cost < costs.get(target, target_cost + 1):
+                    costs[target] = target_cost
+                    if target_cost == cost:
+                        queue.appendleft(target)
+                    else:
+                        queue.append(target)
+
+    def add_edge(self, source: Node, target: Node, is_blocked: Callable[[Node], bool]):
+        """
+        Updates the costs after the given edge was added to the graph.
+        :param source:
+        :param target:
+        :param is_blocked:
+        :return:
+        """
+        source_cost = self._costs.get(self.graph.world_list.node_to_ordinal(source))
+        if source_cost is None:
+            return
+
+        target_ordinal = self.graph.world_list.node_to_ordinal(target)
+        target_cost = source_cost + self._weight(target_ordinal, is_blocked)
+        if target_cost < self._costs.get(target_ordinal, target_cost + 1):
+            self._costs[target_ordinal] = target_cost
+            self._propagate(collections.deque([target_ordinal]), is_blocked)
+
+    def unblock_nodes(self, is_blocked: Callable[[Node], bool]):
+        """
+        Checks again all reached nodes that were blocked, lowering the costs of the ones that are no longer blocked.
+        :param is_blocked:
+        :return:
+        """
+        predecessors = self.graph._predecessors
+        costs = self._costs
+        queue = collections.deque()
+
+        for ordinal, blocked in self._blocked.items():
+            if blocked and not is_blocked(self.graph.world_list.node_from_ordinal(ordinal)):
+                self._blocked[ordinal] = False
+                cost = min((costs[source] for source in predecessors[ordinal] if source in costs),
+                           default=costs[ordinal])
+                if cost < costs[ordinal]:
+                    costs[ordinal] = cost
+                    queue.append(ordinal)
+
+        self._propagate(queue, is_blocked)
+
+    def move_root(self, node: Node, is_blocked: Callable[[Node], bool]) -> bool:
+        """
+        Changes the root to the given node, if it has the same costs as the current root.
+        That's the case when both are reachable from each other with cost 0.
+        :param node:
+        :param is_blocked:
+        :return: If the root was changed.
+        """
+        ordinal = self.graph.world_list.node_to_ordinal(node)
+        if ordinal == self._root:
+            return True
+
+        if self._costs.get(ordinal) != 0:
+            return False
+
+        successors = self.graph._successors
+        visited = {ordinal}
+        to_visit = [ordinal]
+        while to_visit:
+            for target in successors[to_visit.pop()]:
+                if target not in visited and not self._weight(target, is_blocked):
+                    if target == self._root:
+                        self._root = ordinal
+                        return True
+                    visited.add(target)
+                    to_visit.append(target)
+
+        return False
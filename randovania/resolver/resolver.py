@@ -1,4 +1,4 @@
-from typing import Optional, Tuple, Callable
+from typing import Optional, Tuple, Callable, NamedTuple, List
 
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.game_patches import GamePatches
@@ -12,6 +12,15 @@ from randovania.resolver.resolver_reach import ResolverReach
 from randovania.resolver.state import State
 
 
+class ResolverStep(NamedTuple):
+    """
+    A node the resolver acted on, and the nodes it went through to get there from the previous step.
+    Nodes are stored as their ordinal in the WorldList.
+    """
+    node: int
+    previous_nodes: Tuple[int, ...]
+
+
 def _simplify_requirement_list(self: RequirementList, state: State) -> Optional[RequirementList]:
     items = []
     for item in self.values():
@@ -44,6 +53,7 @@ def _simplify_requirement_set_for_additional_requirements(requirements: Requirem
 def _inner_advance_depth(state: State,
                          logic: Logic,
                          status_update: Callable[[str], None],
+                         steps: List[ResolverStep],
                          ) -> Tuple[Optional[State], bool]:
 
     if logic.game.victory_condition.satisfied(state.resources, state.resource_database):
@@ -55,13 +65,24 @@ def _inner_advance_depth(state: State,
 
     has_action = False
     for action in reach.satisfiable_actions(state):
+        new_state = state.act_on_node(action, path=reach.path_to_node[action])
+        # The steps record how we got here, so states of finished branches don't need to be kept alive
+        new_state.previous_state = None
+
         new_result = _inner_advance_depth(
-            state=state.act_on_node(action, path=reach.path_to_node[action]),
+            state=new_state,
             logic=logic,
-            status_update=status_update)
+            status_update=status_update,
+            steps=steps)
 
         # We got a positive result. Send it back up
         if new_result[0] is not None:
+            world_list = logic.game.world_list
+            steps.append(ResolverStep(
+                node=world_list.node_to_ordinal(action),
+                previous_nodes=tuple(world_list.node_to_ordinal(node) for node in reach.path_to_node[action]
+                                     if node is not state.node),
+            ))
             return new_result
         else:
             has_action = True
@@ -74,18 +95,47 @@ def _inner_advance_depth(state: State,
     return None, has_action
 
 
+def advance_depth_with_steps(state: State,
+                             logic: Logic,
+                             status_update: Callable[[str], None],
+                             ) -> Tuple[Optional[State], Optional[Tuple[ResolverStep, ...]]]:
+    """
+    Searches for a sequence of actions that satisfies the victory condition.
+    :param state:
+    :param logic:
+    :param status_update:
+    :return: The final state and the steps taken to reach it, starting with the given state's node.
+    Both are None if the victory condition can't be satisfied.
+    """
+    steps = []
+    final_state = _inner_advance_depth(state, logic, status_update, steps)[0]
+    if final_state is None:
+        return None, None
+
+    steps.append(ResolverStep(logic.game.world_list.node_to_ordinal(state.node), ()))
+    return final_state, tuple(reversed(steps))
+
+
 def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None]) -> Optional[State]:
-    return _inner_advance_depth(state, logic, status_update)[0]
+    return advance_depth_with_steps(state, logic, status_update)[0]
 
 
-def resolve(configuration: LayoutConfiguration,
-            game: GameDescription,
-            patches: GamePatches,
-            status_update: Optional[Callable[[str], None]] = None
-            ) -> Optional[State]:
+def resolve_with_steps(configuration: LayoutConfiguration,
+                       game: GameDescription,
+                       patches: GamePatches,
+                       status_update: Optional[Callable[[str], None]] = None
+                       ) -> Tuple[Optional[State], Optional[Tuple[ResolverStep, ...]]]:
     if status_update is None:
         status_update = lambda s: None
 
     logic, starting_state = logic_bootstrap(configuration, game, patches)
     debug.log_resolve_start()
-    return advance_depth(starting_state, logic, status_update)
+    return advance_depth_with_steps(starting_state, logic, status_update)
+
+
+def resolve(configuration: LayoutConfiguration,
+            game: GameDescription,
+            patches: GamePatches,
+            status_update: Optional[Callable[[str], None]] = None
+            ) -> Optional[State]:
+    return resolve_with_steps(configuration, game, patches, status_update)[0]
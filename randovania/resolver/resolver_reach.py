@@ -10,6 +10,7 @@ from randovania.resolver.state import State
 
 
 class ResolverReach:
+    __slots__ = ("_nodes", "path_to_node", "_satisfiable_requirements", "_safe_nodes", "_logic")
     _nodes: Tuple[Node, ...]
     path_to_node: Dict[Node, Tuple[Node, ...]]
     _satisfiable_requirements: SatisfiableRequirements
@@ -1,14 +1,14 @@
-import copy
 from typing import Optional, Tuple, Iterator
 
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import ResourceNode, Node
 from randovania.game_description.resources import ResourceInfo, CurrentResources, ResourceDatabase, PickupIndex, \
-    ResourceGain, PickupEntry
+    ResourceGain, PickupEntry, ResourceArray
 
 
 class State:
-    resources: CurrentResources
+    __slots__ = ("resources", "node", "patches", "previous_state", "path_from_previous_state", "resource_database")
+    resources: ResourceArray
     node: Node
     patches: GamePatches
     previous_state: Optional["State"]
@@ -21,6 +21,8 @@ class State:
                  patches: GamePatches,
                  previous: Optional["State"],
                  resource_database: ResourceDatabase):
+        if not isinstance(resources, ResourceArray):
+            resources = ResourceArray(resource_database, resources)
         self.resources = resources
         self.node = node
         self.patches = patches
@@ -32,17 +34,49 @@ class State:
         return self.resources.get(resource, 0) > 0
 
     def copy(self) -> "State":
-        return State(copy.copy(self.resources),
+        return State(self.resources.copy(),
                      self.node,
                      self.patches,
                      self.previous_state,
                      self.resource_database)
 
     @property
-    def collected_pickup_indices(self) -> Iterator[PickupIndex]:
-        for resource, count in self.resources.items():
-            if isinstance(resource, PickupIndex) and count > 0:
+    def collected_pickup_indices_mask(self) -> int:
+        """
+        A bitset of the collected PickupIndex, where bit `i` is set for PickupIndex(i).
+        :return:
+        """
+        return self.resources.positive_mask >> self.resource_database.first_pickup_index_ordinal
+
+    def _pickup_indices_in_mask(self, mask: int) -> Iterator[PickupIndex]:
+        """
+        Iterates the PickupIndex of the given bitset, in the order they were added to the resources.
+        :param mask:
+        :return:
+        """
+        remaining = bin(mask).count("1")
+        if not remaining:
+            return
+
+        for resource in self.resources:
+            if isinstance(resource, PickupIndex) and (mask >> resource.index) & 1:
                 yield resource
+                remaining -= 1
+                if not remaining:
+                    return
+
+    @property
+    def collected_pickup_indices(self) -> Iterator[PickupIndex]:
+        return self._pickup_indices_in_mask(self.collected_pickup_indices_mask)
+
+    @property
+    def collected_unassigned_pickup_indices(self) -> Iterator[PickupIndex]:
+        """
+        The collected PickupIndex that have no pickup assigned in the patches.
+        :return:
+        """
+        return self._pickup_indices_in_mask(self.collected_pickup_indices_mask
+                                            & ~self.patches.assigned_pickup_indices_mask)
 
     def collect_resource_node(self, node: ResourceNode) -> "State":
 
@@ -52,8 +86,8 @@ class State:
                 "Trying to collect an already collected resource '{}'".format(
                     resource))
 
-        new_resources = copy.copy(self.resources)
-        add_resource_gain_to_current_resources(node.resource_gain_on_collect(self.patches), new_resources)
+        new_resources = self.resources.copy()
+        new_resources.add_resource_gain(node.resource_gain_on_collect(self.patches))
 
         return State(new_resources, self.node, self.patches, self, self.resource_database)
 
@@ -65,7 +99,7 @@ class State:
 
     def assign_pickup_to_index(self, index: PickupIndex, pickup: PickupEntry) -> "State":
         new_patches = self.patches.assign_new_pickups([(index, pickup)])
-        new_resources = copy.copy(self.resources)
+        new_resources = self.resources.copy()
 
         if index in self.resources:
             add_resource_gain_to_current_resources(pickup.resource_gain(), new_resources)
@@ -20,6 +20,7 @@ def test_distribute_command_logic(mock_generate_list: MagicMock,
     args.sky_temple_keys = LayoutSkyTempleKeyMode.ALL_BOSSES.value
     args.skip_item_loss = True
     args.seed = 15000
+    args.weight_workers = 0
     args.output_file = "asdfasdf/qwerqwerqwer/zxcvzxcv.json"
 
     # Run
@@ -1,14 +1,22 @@
 import dataclasses
 import json
 from pathlib import Path
+from typing import Callable, Optional, Tuple
 from unittest.mock import MagicMock
 
 import pytest
 
+from randovania.game_description import data_reader
 from randovania.game_description.default_database import default_prime2_pickup_database, \
     default_prime2_resource_database
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.resources import PickupDatabase, ResourceDatabase
+from randovania.layout.layout_configuration import LayoutTrickLevel
+from randovania.layout.starting_resources import StartingResourcesConfiguration
+from randovania.resolver import debug
+from randovania.resolver.bootstrap import logic_bootstrap
+from randovania.resolver.logic import Logic
+from randovania.resolver.state import State
 
 
 @pytest.fixture
@@ -22,6 +30,38 @@ def simple_data(test_files_dir: Path) -> dict:
         return json.load(small_game_data)
 
 
+@pytest.fixture()
+def synthetic_data(test_files_dir: Path) -> dict:
+    with test_files_dir.joinpath("synthetic_game_data.json").open("r") as data_file:
+        return json.load(data_file)
+
+
+@pytest.fixture()
+def synthetic_configuration() -> MagicMock:
+    configuration = MagicMock()
+    configuration.trick_level = LayoutTrickLevel.NO_TRICKS
+    configuration.starting_resources.configuration = StartingResourcesConfiguration.VANILLA_ITEM_LOSS_ENABLED
+    configuration.starting_resources.resource_gain = ()
+    return configuration
+
+
+@pytest.fixture()
+def synthetic_bootstrap(synthetic_data: dict,
+                        synthetic_configuration: MagicMock,
+                        monkeypatch,
+                        ) -> Callable[[Optional[dict]], Tuple[Logic, State]]:
+    """
+    Creates the Logic and State for the given game data, or the synthetic game data by default.
+    """
+    monkeypatch.setattr(debug, "_DEBUG_LEVEL", 0)
+
+    def bootstrap(data: Optional[dict] = None) -> Tuple[Logic, State]:
+        game = data_reader.decode_data(synthetic_data if data is None else data, False)
+        return logic_bootstrap(synthetic_configuration, game, GamePatches.with_game(game))
+
+    return bootstrap
+
+
 @pytest.fixture()
 def echoes_resource_database() -> ResourceDatabase:
     return default_prime2_resource_database()
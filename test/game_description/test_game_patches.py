@@ -0,0 +1,22 @@
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import SimpleResourceInfo, PickupIndex, PickupEntry
+
+
+def test_pickup_resource_gain_after_assign_new_pickups(empty_patches: GamePatches):
+    item_a = SimpleResourceInfo(0, "A", "A", ResourceType.ITEM)
+    item_b = SimpleResourceInfo(1, "B", "B", ResourceType.ITEM)
+    pickup_a = PickupEntry("A", ((item_a, 1),), "major", 0)
+    pickup_b = PickupEntry("B", ((item_b, 1), (item_a, 2)), "major", 0)
+
+    patches = empty_patches.assign_new_pickups([(PickupIndex(0), pickup_a)])
+    assert patches.pickup_resource_gain(PickupIndex(0)) == ((PickupIndex(0), 1), (item_a, 1))
+
+    # Run
+    new_patches = patches.assign_new_pickups([(PickupIndex(1), pickup_b)])
+
+    # Assert
+    assert patches.pickup_resource_gain(PickupIndex(1)) == ((PickupIndex(1), 1),)
+    assert new_patches.pickup_resource_gain(PickupIndex(1)) == ((PickupIndex(1), 1), (item_b, 1), (item_a, 2))
+    assert new_patches.pickup_resource_gain(PickupIndex(2)) == ((PickupIndex(2), 1),)
+    assert new_patches == empty_patches.assign_new_pickups([(PickupIndex(0), pickup_a), (PickupIndex(1), pickup_b)])
@@ -1,10 +1,14 @@
+import itertools
+import random
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
 
-from randovania.game_description.requirements import IndividualRequirement, RequirementList, RequirementSet
-from randovania.game_description.resources import SimpleResourceInfo, ResourceDatabase
+from randovania.game_description.requirements import IndividualRequirement, RequirementList, RequirementSet, \
+    satisfied_for_candidates
+from randovania.game_description.resources import SimpleResourceInfo, ResourceDatabase, DamageResourceInfo, \
+    DamageReduction, ResourceArray
 from randovania.game_description.resource_type import ResourceType
 
 
@@ -90,6 +94,68 @@ def test_prevent_redundant():
     assert the_set.alternatives == frozenset([RequirementList(0, [id_req_a])])
 
 
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("count", [5, 50, 300])
+def test_prevent_redundant_many(seed: int, count: int):
+    # setup
+    rng = random.Random(seed)
+    resources = [SimpleResourceInfo(i, str(i), str(i), ResourceType.ITEM) for i in range(12)]
+    alternatives = [
+        RequirementList(rng.randint(0, 2), (IndividualRequirement(resource, rng.choice([1, 1, 2]), False)
+                                            for resource in rng.sample(resources, rng.randint(1, 4))))
+        for _ in range(count)
+    ]
+    input_set = frozenset(alternatives)
+    expected = frozenset(
+        requirement
+        for requirement in input_set
+        if not any(other < requirement for other in input_set)
+    )
+
+    # run
+    result = RequirementSet(alternatives)
+
+    # assert
+    assert list(result.alternatives) == list(expected)
+    assert [alternative.difficulty_level for alternative in result.alternatives] == [
+        alternative.difficulty_level for alternative in expected
+    ]
+    assert RequirementSet(alternatives + [RequirementList(0, [])]) == RequirementSet.trivial()
+
+
+def test_interned_requirement_list():
+    res_a, id_req_a = make_req_a()
+    res_b, id_req_b = make_req_b()
+
+    # run
+    first = RequirementList(0, [id_req_a, id_req_b]).interned()
+    second = RequirementList(0, [id_req_b, id_req_a]).interned()
+    harder = RequirementList(1, [id_req_a, id_req_b]).interned()
+
+    # assert
+    assert first is second
+    assert harder is not first
+    assert harder.difficulty_level == 1
+
+
+def test_interned_requirement_set():
+    res_a, id_req_a = make_req_a()
+    res_b, id_req_b = make_req_b()
+
+    # run
+    first = RequirementSet([RequirementList(0, [id_req_a]), RequirementList(0, [id_req_b])]).interned()
+    second = RequirementSet([RequirementList(0, [id_req_b]), RequirementList(0, [id_req_a])]).interned()
+    harder = RequirementSet([RequirementList(0, [id_req_a]), RequirementList(2, [id_req_b])]).interned()
+
+    # assert
+    assert first is second
+    assert harder is not first
+    assert harder == first
+    assert all(alternative is alternative.interned() for alternative in first.alternatives)
+    assert RequirementSet([RequirementList(0, [])]).interned() is RequirementSet.trivial()
+    assert RequirementSet([]).interned() is RequirementSet.impossible()
+
+
 def test_trivial_merge():
     trivial = RequirementSet.trivial()
     impossible = RequirementSet.impossible()
@@ -108,6 +174,65 @@ def test_trivial_merge():
     assert the_set.union(the_set) == the_set
 
 
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_union_same_as_product(seed: int):
+    # setup
+    rng = random.Random(seed)
+    resources = [SimpleResourceInfo(i, str(i), str(i), ResourceType.ITEM) for i in range(8)]
+
+    def random_set():
+        return RequirementSet(
+            RequirementList(rng.randint(0, 2), (IndividualRequirement(resource, 1, False)
+                                                for resource in rng.sample(resources, rng.randint(1, 3))))
+            for _ in range(rng.randint(1, 12))
+        )
+
+    a, b = random_set(), random_set()
+    expected = RequirementSet(x.union(y) for x in a.alternatives for y in b.alternatives)
+
+    # run
+    result = a.union(b)
+
+    # assert
+    assert sorted((x.sorted, x.difficulty_level) for x in result.alternatives) == sorted(
+        (x.sorted, x.difficulty_level) for x in expected.alternatives)
+
+
+def test_union_short_circuit():
+    the_set = make_single_set(make_req_a())
+
+    assert the_set.union(RequirementSet.trivial()) is the_set
+    assert RequirementSet.trivial().union(the_set) is the_set
+    assert the_set.union(RequirementSet.impossible()) is RequirementSet.impossible()
+
+
+def test_union_max_alternatives():
+    res_a, id_req_a = make_req_a()
+    res_b, id_req_b = make_req_b()
+    res_c, id_req_c = make_req_c()
+    left = RequirementSet([
+        RequirementList(0, [id_req_a]),
+        RequirementList(0, [id_req_b, id_req_c]),
+    ])
+    right = RequirementSet([
+        RequirementList(0, [id_req_a]),
+        RequirementList(0, [id_req_b]),
+    ])
+
+    # run
+    full = left.union(right)
+    capped = left.union(right, max_alternatives=1)
+
+    # assert
+    assert full == RequirementSet([
+        RequirementList(0, [id_req_a]),
+        RequirementList(0, [id_req_b, id_req_c]),
+    ])
+    assert capped == RequirementSet([RequirementList(0, [id_req_a])])
+    assert capped.alternatives <= full.alternatives
+    assert left.union(right, max_alternatives=2) == full
+
+
 @pytest.mark.parametrize("replacement", [
     RequirementSet.impossible(),
     make_single_set(make_req_a()),
@@ -161,6 +286,29 @@ def test_minimum_satisfied_difficulty(database: ResourceDatabase, resources, exp
     assert diff == expected_level
 
 
+def test_set_resource_ordinals():
+    # setup
+    item_a = SimpleResourceInfo(0, "A", "A", ResourceType.ITEM)
+    item_b = SimpleResourceInfo(1, "B", "B", ResourceType.ITEM)
+    energy_tank = SimpleResourceInfo(42, "Energy Tank", "ET", ResourceType.ITEM)
+    suit = SimpleResourceInfo(13, "Dark Suit", "DS", ResourceType.ITEM)
+    dark = DamageResourceInfo(0, "Dark", "Dark", (DamageReduction(suit, 0.5),))
+    database = ResourceDatabase(item=[item_a, item_b, energy_tank, suit], event=[], trick=[], damage=[dark],
+                                version=[], misc=[], difficulty=[])
+
+    the_set = RequirementSet([
+        RequirementList(0, [IndividualRequirement(item_a, 1, False)]),
+        RequirementList(0, [IndividualRequirement(item_b, 1, True), IndividualRequirement(dark, 50, False)]),
+    ])
+
+    # run
+    ordinals = the_set.resource_ordinals(database)
+
+    # assert
+    assert ordinals == {0, 1, 2, 3, 4}
+    assert RequirementSet.trivial().resource_ordinals(database) == set()
+
+
 @pytest.mark.parametrize(["input_data", "output_data"], [
     ([], []),
     ([(0, False)], []),
@@ -203,3 +351,182 @@ def test_set_dangerous_resources():
 
     # Assert
     assert result == {1, 2, 3, "a", "b", "c"}
+
+
+@pytest.mark.parametrize(["resources", "expected"], [
+    ({}, False),
+    ({"A": 1}, False),
+    ({"A": 2}, True),
+    ({"A": 2, "B": 1}, False),
+    ({"B": 1}, False),
+    ({"B": 1, "C": 1, "Energy": 1}, True),
+    ({"B": 1, "C": 1, "Energy": 2}, False),
+    ({"C": 1, "Energy": 3}, True),
+    ({"C": 1, "Energy": 2, "Suit": 1}, True),
+])
+def test_set_satisfied_compiled(resources, expected):
+    # setup
+    item_a, item_b, item_c = [SimpleResourceInfo(i, name, name, ResourceType.ITEM) for i, name in enumerate("ABC")]
+    suit = SimpleResourceInfo(13, "Suit", "Suit", ResourceType.ITEM)
+    energy_tank = SimpleResourceInfo(42, "Energy", "Energy", ResourceType.ITEM)
+    damage = DamageResourceInfo(2, "Damage", "Damage", (DamageReduction(suit, 0.5),))
+    database = ResourceDatabase(item=[item_a, item_b, item_c, suit, energy_tank], event=[], trick=[],
+                                damage=[damage], version=[], misc=[], difficulty=[])
+
+    the_set = RequirementSet([
+        RequirementList(0, [IndividualRequirement(item_a, 2, False), IndividualRequirement(item_b, 1, True)]),
+        RequirementList(0, [IndividualRequirement(item_b, 1, False), IndividualRequirement(item_c, 1, False),
+                            IndividualRequirement(energy_tank, 2, True)]),
+        RequirementList(0, [IndividualRequirement(item_c, 1, False), IndividualRequirement(damage, 300, False)]),
+    ])
+    current_resources = {
+        item: resources[item.long_name]
+        for item in database.item
+        if item.long_name in resources
+    }
+
+    # run
+    result = the_set.satisfied(current_resources, database)
+
+    # assert
+    assert result == expected
+    assert result == any(all(individual.satisfied(current_resources, database) for individual in alternative.values())
+                         for alternative in the_set.alternatives)
+
+
+@pytest.mark.parametrize("amount", [0, 10, 50, 99, 100, 101, 150, 299, 300, 301])
+@pytest.mark.parametrize("energy_tanks", [0, 1, 2, 3])
+def test_damage_satisfied(amount: int, energy_tanks: int):
+    # setup
+    suit, visor = [SimpleResourceInfo(i, name, name, ResourceType.ITEM) for i, name in ((13, "Suit"), (14, "Visor"))]
+    energy_tank = SimpleResourceInfo(42, "Energy", "Energy", ResourceType.ITEM)
+    damage = DamageResourceInfo(0, "Dark", "Dark", (DamageReduction(suit, 0.5), DamageReduction(visor, 0.1)))
+    database = ResourceDatabase(item=[suit, visor, energy_tank], event=[], trick=[], damage=[damage], version=[],
+                                misc=[], difficulty=[])
+    individual = IndividualRequirement(damage, amount, False)
+    the_set = RequirementSet([RequirementList(0, [individual])])
+
+    for owned in ([], [suit], [visor], [suit, visor]):
+        current_resources = {item: 1 for item in owned}
+        current_resources[energy_tank] = energy_tanks
+
+        multiplier = 1
+        for reduction in damage.reductions:
+            if reduction.inventory_item in owned:
+                multiplier *= reduction.damage_multiplier
+        expected = energy_tanks * 100 >= multiplier * amount
+
+        # run
+        results = [
+            individual.satisfied(current_resources, database),
+            the_set.satisfied(current_resources, database),
+            the_set.satisfied(ResourceArray(database, current_resources), database),
+        ]
+
+        # assert
+        assert results == [expected] * 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_satisfied_for_candidates(seed: int):
+    # setup
+    rng = random.Random(seed)
+    items = [SimpleResourceInfo(i, "Item {}".format(i), "I{}".format(i), ResourceType.ITEM) for i in range(6)]
+    energy_tank = SimpleResourceInfo(42, "Energy", "Energy", ResourceType.ITEM)
+    damage = DamageResourceInfo(0, "Dark", "Dark", (DamageReduction(items[0], 0.5),))
+    database = ResourceDatabase(item=items + [energy_tank], event=[], trick=[], damage=[damage], version=[],
+                                misc=[], difficulty=[])
+
+    def random_individual():
+        if rng.random() < 0.1:
+            return IndividualRequirement(damage, rng.choice([50, 150, 250]), False)
+        return IndividualRequirement(rng.choice(items), rng.choice([1, 1, 2]), rng.random() < 0.2)
+
+    requirements = [
+        RequirementSet(RequirementList(0, (random_individual() for _ in range(rng.randint(0, 3))))
+                       for _ in range(rng.randint(0, 3)))
+        for _ in range(30)
+    ]
+    candidates = [
+        ResourceArray(database, {item: rng.randint(0, 2) for item in rng.sample(items + [energy_tank], 4)})
+        for _ in range(10)
+    ]
+
+    # run
+    result = satisfied_for_candidates(requirements, candidates, database)
+
+    # assert
+    assert result == [
+        sum(1 << i for i, candidate in enumerate(candidates) if requirement_set.satisfied(candidate, database))
+        for requirement_set in requirements
+    ]
+
+
+def test_list_minimized():
+    # setup
+    item_a, item_b = [SimpleResourceInfo(i, name, name, ResourceType.ITEM) for i, name in enumerate("AB")]
+    event = SimpleResourceInfo(0, "Event", "Event", ResourceType.EVENT)
+    maximum_amounts = {event: 1}
+
+    def make_list(*individuals):
+        return RequirementList(0, [IndividualRequirement(*individual) for individual in individuals])
+
+    # run and assert
+    assert make_list((item_a, 1, False), (item_a, 3, False), (item_b, 0, False)).minimized(
+        maximum_amounts) == make_list((item_a, 3, False))
+    assert make_list((item_a, 2, True), (item_a, 4, True)).minimized(maximum_amounts) == make_list((item_a, 2, True))
+    assert make_list((item_a, 2, False), (item_a, 2, True)).minimized(maximum_amounts) is None
+    assert make_list((event, 2, False)).minimized(maximum_amounts) is None
+    assert make_list((item_a, 1, False), (event, 2, True)).minimized(maximum_amounts) == make_list((item_a, 1, False))
+
+
+def test_set_minimized_merges_quantities():
+    # setup
+    item_a, item_b = [SimpleResourceInfo(i, name, name, ResourceType.ITEM) for i, name in enumerate("AB")]
+    the_set = RequirementSet([
+        RequirementList(0, [IndividualRequirement(item_a, 2, False)]),
+        RequirementList(0, [IndividualRequirement(item_a, 5, False), IndividualRequirement(item_b, 1, False)]),
+        RequirementList(1, [IndividualRequirement(item_a, 1, False)]),
+        RequirementList(2, [IndividualRequirement(item_b, 1, False)]),
+    ])
+
+    # run
+    result = the_set.minimized({})
+
+    # assert
+    assert result == RequirementSet([
+        RequirementList(0, [IndividualRequirement(item_a, 2, False)]),
+        RequirementList(1, [IndividualRequirement(item_a, 1, False)]),
+        RequirementList(2, [IndividualRequirement(item_b, 1, False)]),
+    ])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_set_minimized_same_satisfied(seed: int):
+    # setup
+    rng = random.Random(seed)
+    items = [SimpleResourceInfo(i, "Item {}".format(i), "I{}".format(i), ResourceType.ITEM) for i in range(4)]
+    events = [SimpleResourceInfo(i, "Event {}".format(i), "E{}".format(i), ResourceType.EVENT) for i in range(2)]
+    maximum_amounts = {event: 1 for event in events}
+
+    def random_individual():
+        return IndividualRequirement(rng.choice(items + events), rng.randint(0, 3), rng.random() < 0.3)
+
+    requirements = [
+        RequirementSet(RequirementList(0, (random_individual() for _ in range(rng.randint(0, 3))))
+                       for _ in range(rng.randint(0, 5)))
+        for _ in range(30)
+    ]
+    all_resources = [
+        dict(zip(items + events, amounts))
+        for amounts in itertools.product(range(4), range(4), range(3), range(2), range(2), range(2))
+    ]
+
+    for requirement_set in requirements:
+        # run
+        result = requirement_set.minimized(maximum_amounts)
+
+        # assert
+        assert len(result.alternatives) <= len(requirement_set.alternatives)
+        for resources in all_resources:
+            assert result.satisfied(resources, None) == requirement_set.satisfied(resources, None)
@@ -1,6 +1,21 @@
 import pytest
 
-from randovania.game_description.resources import merge_resources, PickupIndex
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import merge_resources, PickupIndex, ResourceDatabase, SimpleResourceInfo, \
+    ResourceArray
+
+
+@pytest.fixture(name="database")
+def _database() -> ResourceDatabase:
+    return ResourceDatabase(
+        item=[SimpleResourceInfo(0, "A", "A", ResourceType.ITEM), SimpleResourceInfo(1, "B", "B", ResourceType.ITEM)],
+        event=[SimpleResourceInfo(0, "E", "E", ResourceType.EVENT)],
+        trick=[],
+        damage=[],
+        version=[],
+        misc=[],
+        difficulty=[],
+    )
 
 
 @pytest.mark.parametrize(["a", "b", "result"], [
@@ -18,3 +33,114 @@ def test_pickup_index_equality():
 def test_pickup_index_has():
     d = {PickupIndex(1): True}
     assert PickupIndex(1) in d
+
+
+def test_resource_ordinals(database):
+    assert [database.resource_ordinal(resource) for resource in database.item + database.event] == [0, 1, 2]
+    assert database.resource_ordinal(PickupIndex(0)) == 3
+    assert database.resource_ordinal(PickupIndex(5)) == 8
+
+    with pytest.raises(KeyError):
+        database.resource_ordinal(SimpleResourceInfo(0, "Z", "Z", ResourceType.TRICK))
+
+
+def test_resource_array_mapping(database):
+    item_a, item_b = database.item
+    event = database.event[0]
+
+    resources = ResourceArray(database, {event: 1, item_a: 0})
+    resources[PickupIndex(3)] = 1
+    resources[item_b] = 2
+
+    assert list(resources) == [event, item_a, PickupIndex(3), item_b]
+    assert resources == {event: 1, item_a: 0, PickupIndex(3): 1, item_b: 2}
+    assert item_a in resources
+    assert PickupIndex(4) not in resources
+    assert resources.get(PickupIndex(4), 0) == 0
+    assert resources.get(SimpleResourceInfo(0, "Z", "Z", ResourceType.TRICK)) is None
+    assert resources.positive_mask == 0b1000110
+
+    del resources[item_a]
+    assert item_a not in resources
+    assert len(resources) == 3
+
+
+def test_resource_array_copy_is_independent(database):
+    item_a, item_b = database.item
+    resources = ResourceArray(database, {item_a: 1})
+
+    copied = resources.copy()
+    copied[item_a] = 0
+    copied[item_b] = 1
+
+    assert resources == {item_a: 1}
+    assert copied == {item_a: 0, item_b: 1}
+    assert resources.positive_mask == 0b01
+    assert copied.positive_mask == 0b10
+
+
+def test_resource_array_changed_ordinals(database):
+    item_a, item_b = database.item
+    event = database.event[0]
+    resources = ResourceArray(database, {item_a: 1, event: 0})
+
+    changed = resources.copy()
+    changed[item_a] = 2
+    changed[event] = 0
+    changed[item_b] = 0
+    changed[PickupIndex(1)] = 1
+
+    assert resources.changed_ordinals(resources.copy()) == []
+    assert resources.changed_ordinals(changed) == [0, 4]
+    assert changed.changed_ordinals(resources) == [0, 4]
+    assert resources.changed_presence_ordinals(changed) == [1, 4]
+    assert changed.changed_presence_ordinals(resources) == [1, 4]
+
+
+def test_resource_array_copies_share_amounts(database):
+    item_a, item_b = database.item
+    event = database.event[0]
+    resources = ResourceArray(database, {item_a: 1, event: 1})
+
+    first = resources.copy()
+    second = resources.copy()
+    first[item_b] = 2
+    second[item_a] = 0
+    resources[event] = 0
+    del second[event]
+
+    assert first.amounts is resources.amounts
+    assert resources == {item_a: 1, event: 0}
+    assert first == {item_a: 1, event: 1, item_b: 2}
+    assert second == {item_a: 0}
+    assert list(first) == [item_a, event, item_b]
+    assert resources.changed_ordinals(first) == [1, 2]
+    assert first.changed_ordinals(second) == [0, 1, 2]
+
+
+def test_resource_array_long_chain_of_copies(database):
+    resources = ResourceArray(database)
+    expected = {}
+
+    for i in range(100):
+        resources = resources.copy()
+        resources[PickupIndex(i)] = 1
+        expected[PickupIndex(i)] = 1
+
+    assert resources == expected
+    assert list(resources) == list(expected)
+    assert resources.amount_at(database.resource_ordinal(PickupIndex(50))) == 1
+    assert resources.amount_at(database.resource_ordinal(PickupIndex(500))) == 0
+
+
+def test_resource_array_add_resource_gain(database):
+    item_a, item_b = database.item
+    resources = ResourceArray(database, {item_a: 1})
+    copied = resources.copy()
+
+    copied.add_resource_gain(((PickupIndex(2), 1), (item_a, 2), (item_b, 0), (item_a, -1)))
+
+    assert resources == {item_a: 1}
+    assert list(copied) == [item_a, PickupIndex(2), item_b]
+    assert copied == {item_a: 2, PickupIndex(2): 1, item_b: 0}
+    assert copied.positive_mask == 0b100001
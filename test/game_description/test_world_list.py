@@ -0,0 +1,62 @@
+import copy
+import gc
+import weakref
+from unittest.mock import patch
+
+from randovania.game_description.area import Area
+from randovania.game_description.node import GenericNode
+from randovania.game_description.requirements import RequirementSet, RequirementList, IndividualRequirement
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import ResourceDatabase, SimpleResourceInfo
+from randovania.game_description.world import World
+from randovania.game_description.world_list import WorldList
+
+
+def test_simplify_connections_shared_between_copies():
+    item = SimpleResourceInfo(0, "Item", "I", ResourceType.ITEM)
+    trick = SimpleResourceInfo(0, "Trick", "T", ResourceType.TRICK)
+    database = ResourceDatabase([item], [], [trick], [], [], [], [])
+
+    n1 = GenericNode("n1", False, 0)
+    n2 = GenericNode("n2", False, 1)
+    requirements = RequirementSet([
+        RequirementList(0, [IndividualRequirement(item, 1, False)]),
+        RequirementList(0, [IndividualRequirement(trick, 1, False)]),
+    ])
+    world_list = WorldList([World("World", 0, [Area("Area", 0, 0, [n1, n2], {n1: {n2: requirements}, n2: {}})])])
+
+    first = copy.deepcopy(world_list)
+    second = copy.deepcopy(world_list)
+
+    # Run
+    first.simplify_connections({trick: 0}, database)
+    with patch.object(RequirementSet, "simplify") as mock_simplify:
+        second.simplify_connections({trick: 0}, database)
+        first.simplify_connections({trick: 0}, database)
+
+    # Assert
+    mock_simplify.assert_not_called()
+    first_requirements = first.worlds[0].areas[0].connections[n1][n2]
+    assert first_requirements == RequirementSet([RequirementList(0, [IndividualRequirement(item, 1, False)])])
+    assert second.worlds[0].areas[0].connections[n1][n2] is first_requirements
+    assert world_list.worlds[0].areas[0].connections[n1][n2] is requirements
+
+
+def test_simplify_connections_cache_collected_with_database():
+    # Setup
+    item = SimpleResourceInfo(0, "Item", "I", ResourceType.ITEM)
+    database = ResourceDatabase([item], [], [], [], [], [], [])
+    n1 = GenericNode("n1", False, 0)
+    n2 = GenericNode("n2", False, 1)
+    requirements = RequirementSet([RequirementList(0, [IndividualRequirement(item, 1, False)])])
+    world_list = WorldList([World("World", 0, [Area("Area", 0, 0, [n1, n2], {n1: {n2: requirements}, n2: {}})])])
+    world_list.simplify_connections({}, database)
+    world_list.worlds[0].areas[0].connections[n1][n2].compiled_ordinals(database)
+    database_ref = weakref.ref(database)
+
+    # Run
+    del database, world_list, requirements
+    gc.collect()
+
+    # Assert
+    assert database_ref() is None
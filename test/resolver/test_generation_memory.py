@@ -0,0 +1,116 @@
+import gc
+import tracemalloc
+from random import Random
+from typing import Callable
+from unittest.mock import MagicMock
+
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.resources import ResourceArray, PickupIndex
+from randovania.resolver.filler import retcon
+from randovania.resolver.generator_reach import reach_with_all_safe_resources, GraphPath
+from randovania.resolver.reach_graph import ReachGraph
+from randovania.resolver.resolver_reach import ResolverReach
+
+# How many copies are kept alive while measuring, so the allocation of each one dominates
+_COPIES = 1000
+
+# The retcon filler keeps its reach and an overlay of it alive, plus the states and requirements they create.
+# Its peak was measured between 4.3 and 5.3 times the peak of creating a single reach.
+_MAXIMUM_PEAK_TO_REACH_RATIO = 8
+
+
+def _allocated_by_copies(create: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        copies = [create() for _ in range(_COPIES)]
+        allocated = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(copies) == _COPIES
+    return allocated
+
+
+def _peak_allocation(run: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+def test_hot_path_objects_have_no_dict(synthetic_bootstrap):
+    # Setup
+    logic, state = synthetic_bootstrap()
+    requirements = next(
+        requirements
+        for node in logic.game.world_list.all_nodes
+        for _, requirements in logic.game.world_list.potential_nodes_from(node, state.patches)
+        if any(alternative.items for alternative in requirements.alternatives)
+    )
+    alternative = next(alternative for alternative in requirements.alternatives if alternative.items)
+
+    # Run
+    objects = [
+        state,
+        state.resources,
+        PickupIndex(0),
+        requirements,
+        alternative,
+        next(iter(alternative.items)),
+        GraphPath(None, state.node, RequirementSet.trivial()),
+        ReachGraph(logic.game.world_list),
+        reach_with_all_safe_resources(logic, state),
+        ResolverReach.calculate_reach(logic, state),
+    ]
+
+    # Assert
+    assert [type(obj).__name__ for obj in objects if hasattr(obj, "__dict__")] == []
+
+
+def test_retcon_filler_peak_allocation(synthetic_bootstrap):
+    # Setup
+    logic, state = synthetic_bootstrap()
+    pickups = tuple(sorted(logic.game.pickup_database.pickups.values()))
+
+    # Run
+    reach_peak = _peak_allocation(lambda: reach_with_all_safe_resources(logic, state))
+    filler_peak = _peak_allocation(
+        lambda: retcon.retcon_playthrough_filler(logic, state, pickups, Random(1000), MagicMock()))
+
+    # Assert
+    assert filler_peak < reach_peak * _MAXIMUM_PEAK_TO_REACH_RATIO, "{} bytes against {} bytes".format(
+        filler_peak, reach_peak)
+
+
+def test_resource_array_copy_smaller_than_dict(synthetic_bootstrap):
+    # Setup
+    logic, state = synthetic_bootstrap()
+    database = logic.game.resource_database
+
+    # The synthetic game starts with few resources, unlike Echoes, so all items are given to compare at a similar size
+    resources = ResourceArray(database, dict(state.resources.items()))
+    for item in database.item:
+        resources[item] = 1
+    resource = database.item[0]
+
+    def array_copy():
+        result = resources.copy()
+        result[resource] = result.get(resource, 0) + 1
+        return result
+
+    def dict_copy():
+        result = dict(resources.items())
+        result[resource] = result.get(resource, 0) + 1
+        return result
+
+    # Run
+    array_size = _allocated_by_copies(array_copy)
+    dict_size = _allocated_by_copies(dict_copy)
+
+    # Assert
+    assert array_size < dict_size / 2, "{} bytes against {} bytes".format(array_size, dict_size)
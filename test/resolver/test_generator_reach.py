@@ -1,11 +1,14 @@
+import copy
 import pprint
 from typing import Tuple, List, Iterator
+from unittest.mock import patch
 
 import pytest
 
 from randovania.game_description import data_reader
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import ResourceNode, Node, PickupNode
+from randovania.game_description.requirements import RequirementSet
 from randovania.games.prime import default_data
 from randovania.layout.layout_configuration import LayoutConfiguration, LayoutTrickLevel, LayoutRandomizedFlag, \
     LayoutSkyTempleKeyMode
@@ -16,10 +19,11 @@ from randovania.layout.starting_resources import StartingResources
 from randovania.resolver.bootstrap import logic_bootstrap
 from randovania.resolver.generator_reach import GeneratorReach, filter_reachable, filter_pickup_nodes, \
     reach_with_all_safe_resources, get_uncollected_resource_nodes_of_reach, \
-    advance_reach_with_possible_unsafe_resources
+    advance_reach_with_possible_unsafe_resources, collect_all_safe_resources_in_reach, pickup_nodes_that_can_reach, \
+    advance_to_with_reach_copy, advance_to_with_reach_copies
 from randovania.resolver.item_pool import calculate_item_pool, calculate_available_pickups
 from randovania.resolver.logic import Logic
-from randovania.resolver.state import State, add_resource_gain_to_state
+from randovania.resolver.state import State, add_resource_gain_to_state, state_with_pickup
 
 
 def _filter_pickups(nodes: Iterator[Node]) -> Iterator[PickupNode]:
@@ -112,3 +116,260 @@ def test_calculate_reach_with_all_pickups(test_data):
     # assert (len(list(second_reach.nodes)), len(second_actions)) == (898, 9)
     pprint.pprint(first_actions)
     assert all_pickups == found_pickups
+
+
+def _state_with_item(reach: GeneratorReach, name: str = "Item 0") -> State:
+    return state_with_pickup(reach.state, reach.logic.game.pickup_database.pickup_by_name(name))
+
+
+def _assert_same_reach(reach: GeneratorReach, expected: GeneratorReach):
+    assert reach.state.node == expected.state.node
+    assert dict(reach.state.resources.items()) == dict(expected.state.resources.items())
+    assert set(reach.nodes) == set(expected.nodes)
+    assert set(reach.safe_nodes) == set(expected.safe_nodes)
+    assert set(reach.connected_nodes) == set(expected.connected_nodes)
+    assert reach.unreachable_nodes_with_requirements() == expected.unreachable_nodes_with_requirements()
+
+
+@pytest.fixture(name="synthetic_reach")
+def _synthetic_reach(synthetic_bootstrap) -> GeneratorReach:
+    return reach_with_all_safe_resources(*synthetic_bootstrap())
+
+
+@pytest.fixture(name="reach_with_item")
+def _reach_with_item(synthetic_reach) -> GeneratorReach:
+    """
+    A copy of the synthetic reach, advanced to a state with Item 0, to compare against the incremental changes.
+    """
+    return advance_to_with_reach_copy(synthetic_reach, _state_with_item(synthetic_reach))
+
+
+def test_overlay_discard_keeps_base(synthetic_reach, reach_with_item):
+    # Setup
+    reach = synthetic_reach
+    nodes = list(reach.nodes)
+    safe_nodes = list(reach.safe_nodes)
+    edges = set(reach._digraph.edges())
+    unreachable_paths = list(reach._unreachable_paths.items())
+    state = reach.state
+
+    # Run
+    overlay = reach.overlay()
+    with pytest.raises(AssertionError):
+        reach.overlay()
+    overlay.advance_to(_state_with_item(reach))
+    collect_all_safe_resources_in_reach(overlay)
+    overlay_nodes = list(overlay.nodes)
+    overlay.discard()
+
+    # Assert
+    assert overlay_nodes == list(reach_with_item.nodes)
+    assert len(overlay_nodes) > len(nodes)
+    assert reach.state is state
+    assert list(reach.nodes) == nodes
+    assert list(reach.safe_nodes) == safe_nodes
+    assert set(reach._digraph.edges()) == edges
+    assert list(reach._unreachable_paths.items()) == unreachable_paths
+    reach.overlay().discard()
+
+
+def test_overlay_commit_matches_deepcopy(synthetic_reach, reach_with_item):
+    # Setup
+    reach = synthetic_reach
+    new_state = _state_with_item(reach)
+
+    # Run
+    overlay = reach.overlay()
+    with pytest.raises(AssertionError):
+        reach.advance_to(new_state)
+    overlay.advance_to(new_state)
+    collect_all_safe_resources_in_reach(overlay)
+    overlay.commit()
+
+    # Assert
+    assert list(reach.nodes) == list(reach_with_item.nodes)
+    assert list(reach.safe_nodes) == list(reach_with_item.safe_nodes)
+    _assert_same_reach(reach, reach_with_item)
+
+
+def test_reach_copies_discard_outstanding_overlay(synthetic_reach):
+    # Setup
+    reach = synthetic_reach
+    states = [_state_with_item(reach, name) for name in ("Item 0", "Item 1")]
+    nodes = list(reach.nodes)
+    expected = advance_to_with_reach_copy(reach, states[1])
+
+    # Run
+    copies = advance_to_with_reach_copies(reach, states)
+    next(copies)
+    second = next(copies)
+    second_nodes = list(second.nodes)
+    copies.close()
+
+    # Assert
+    assert second_nodes == list(expected.nodes)
+    assert list(reach.nodes) == nodes
+    reach.overlay().discard()
+
+
+def test_reach_copies_end_after_commit(synthetic_reach, reach_with_item):
+    # Setup
+    reach = synthetic_reach
+    states = [_state_with_item(reach, name) for name in ("Item 0", "Item 1")]
+
+    # Run
+    copies = advance_to_with_reach_copies(reach, states)
+    next(copies).commit()
+    remaining = list(copies)
+
+    # Assert
+    assert remaining == []
+    assert list(reach.nodes) == list(reach_with_item.nodes)
+    reach.overlay().discard()
+
+
+def test_rollback_restores_reach(synthetic_reach, reach_with_item):
+    # Setup
+    reach = synthetic_reach
+    new_state = _state_with_item(reach)
+    reach.unreachable_nodes_with_requirements()
+
+    expected = copy.deepcopy(reach)
+    expected_edges = list(expected._digraph.edges())
+
+    # Run
+    reach.begin()
+    reach.advance_to(new_state)
+    collect_all_safe_resources_in_reach(reach)
+    reach.unreachable_nodes_with_requirements()
+    advanced_nodes = list(reach.nodes)
+    reach.rollback()
+
+    # Assert
+    assert advanced_nodes == list(reach_with_item.nodes)
+    assert list(reach.nodes) == list(expected.nodes)
+    assert list(reach.safe_nodes) == list(expected.safe_nodes)
+    assert sorted(reach._digraph.edges(), key=str) == sorted(expected_edges, key=str)
+    assert list(reach._unreachable_paths.items()) == list(expected._unreachable_paths.items())
+    assert {ordinal: edges for ordinal, edges in reach._unreachable_paths_by_resource.items() if edges} == {
+        ordinal: edges for ordinal, edges in expected._unreachable_paths_by_resource.items() if edges}
+    assert reach._simplified_paths == expected._simplified_paths
+    assert reach._simplified_resources is expected._simplified_resources
+    _assert_same_reach(reach, expected)
+
+    reach.advance_to(new_state)
+    collect_all_safe_resources_in_reach(reach)
+    assert list(reach.nodes) == list(reach_with_item.nodes)
+    assert list(reach.safe_nodes) == list(reach_with_item.safe_nodes)
+
+
+def test_rollback_unreachable_path_removed_twice(synthetic_reach):
+    # Setup
+    reach = synthetic_reach
+    edge, requirements = next(iter(reach._unreachable_paths.items()))
+    unreachable_paths = list(reach._unreachable_paths.items())
+    by_resource = {ordinal: set(edges) for ordinal, edges in reach._unreachable_paths_by_resource.items() if edges}
+
+    # Run
+    reach.begin()
+    reach._remove_unreachable_path(edge)
+    reach._add_unreachable_path(edge, requirements)
+    reach._remove_unreachable_path(edge)
+    reach.rollback()
+
+    # Assert
+    assert list(reach._unreachable_paths.items()) == unreachable_paths
+    assert {ordinal: edges for ordinal, edges in reach._unreachable_paths_by_resource.items() if edges} == by_resource
+
+
+def test_unreachable_nodes_with_requirements_simplifies_only_changed_paths(synthetic_reach):
+    # Setup
+    reach = synthetic_reach
+    new_state = _state_with_item(reach)
+
+    # Run
+    with patch.object(RequirementSet, "simplify", autospec=True, side_effect=RequirementSet.simplify) as simplify:
+        first = reach.unreachable_nodes_with_requirements()
+        first_count = simplify.call_count
+
+        second = reach.unreachable_nodes_with_requirements()
+        second_count = simplify.call_count - first_count
+
+        reach.advance_to(new_state)
+        collect_all_safe_resources_in_reach(reach)
+        before_third = simplify.call_count
+        third = reach.unreachable_nodes_with_requirements()
+        third_count = simplify.call_count - before_third
+
+        rebuilt = reach_with_all_safe_resources(reach.logic, reach.state)
+        before_rebuilt = simplify.call_count
+        rebuilt_result = rebuilt.unreachable_nodes_with_requirements()
+        rebuilt_count = simplify.call_count - before_rebuilt
+
+    # Assert
+    # Nothing is simplified again while the reach doesn't change, then only the paths that depend on the new resources
+    assert first_count > 0
+    assert second_count == 0
+    assert second == first
+    assert 0 < third_count < rebuilt_count
+    assert third == rebuilt_result
+    _assert_same_reach(reach, rebuilt)
+
+
+def test_advance_to_state_changed_in_place(synthetic_reach, reach_with_item):
+    # Setup
+    reach = synthetic_reach
+    pickup = reach.logic.game.pickup_database.pickup_by_name("Item 0")
+    initial_nodes = set(reach.nodes)
+
+    # Run
+    add_resource_gain_to_state(reach.state, pickup.resource_gain())
+    reach.state.previous_state = reach.state
+    reach.advance_to(reach.state)
+    collect_all_safe_resources_in_reach(reach)
+
+    # Assert
+    assert set(reach.nodes) > initial_nodes
+    _assert_same_reach(reach, reach_with_item)
+    _assert_same_reach(reach, reach_with_all_safe_resources(reach.logic, reach.state))
+
+
+def test_pickup_nodes_that_can_reach(synthetic_reach):
+    # Setup
+    reach = synthetic_reach
+    pickup_nodes = list(filter_pickup_nodes(reach.logic.game.world_list.all_nodes))
+    safe_nodes = set(list(reach.safe_nodes)[:3])
+
+    # Run
+    result = list(pickup_nodes_that_can_reach(iter(pickup_nodes), reach, safe_nodes))
+
+    # Assert
+    assert result == [
+        node for node in pickup_nodes
+        if node in safe_nodes or set(reach.shortest_path_from(node).keys()).intersection(safe_nodes)
+    ]
+    assert reach.nodes_that_can_reach(frozenset(safe_nodes)) is reach.nodes_that_can_reach(frozenset(safe_nodes))
+
+
+def test_act_on_removes_edges_negating_dangerous_event(synthetic_data: dict, synthetic_bootstrap):
+    # Setup
+    data = synthetic_data
+    not_event = [[{"requirement_type": 1, "requirement_index": 0, "amount": 1, "negate": True}]]
+    nodes = {node["name"]: node for node in data["worlds"][0]["areas"][0]["nodes"]}
+    nodes["Middle"]["connections"]["Event"] = [[]]
+    nodes["Middle"]["connections"]["Elevator"] = not_event
+    nodes["Door A"]["connections"]["Middle"] = not_event
+
+    reach = reach_with_all_safe_resources(*synthetic_bootstrap(data))
+    area_nodes = {node.name: node for node in reach.logic.game.world_list.worlds[0].areas[0].nodes}
+    event = area_nodes["Event"].resource()
+    initial_safe_nodes = set(reach.safe_nodes)
+
+    # Run
+    reach.act_on(area_nodes["Event"])
+    collect_all_safe_resources_in_reach(reach)
+
+    # Assert
+    assert reach.state.has_resource(event)
+    assert set(reach.safe_nodes) != initial_safe_nodes
+    _assert_same_reach(reach, reach_with_all_safe_resources(reach.logic, reach.state))
@@ -0,0 +1,132 @@
+from random import Random
+
+import networkx
+import pytest
+
+from randovania.game_description.area import Area
+from randovania.game_description.node import GenericNode
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.world import World
+from randovania.game_description.world_list import WorldList
+from randovania.resolver.reach_graph import ReachGraph, IncrementalComponent, IncrementalCosts
+
+
+def _random_graphs(seed: int):
+    rng = Random(seed)
+    nodes = [GenericNode("n{}".format(i), False, i) for i in range(30)]
+    world_list = WorldList([World("World", 0, [Area("Area", 0, 0, nodes, {node: {} for node in nodes})])])
+
+    graph = ReachGraph(world_list)
+    digraph = networkx.DiGraph()
+    for node in nodes:
+        if rng.random() < 0.8:
+            graph.add_node(node)
+            digraph.add_node(node)
+
+    present = list(digraph.nodes)
+    for _ in range(60):
+        source, target = rng.choice(present), rng.choice(present)
+        graph.add_edge(source, target, RequirementSet.trivial())
+        digraph.add_edge(source, target)
+
+    return graph, digraph, present, set(rng.sample(present, 8))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_queries_match_networkx(seed: int):
+    # Setup
+    graph, digraph, nodes, blocked = _random_graphs(seed)
+    source = nodes[0]
+
+    # Run
+    costs = graph.costs_from(source, blocked.__contains__)
+    component = graph.strongly_connected_component(source)
+    paths = graph.shortest_paths_from(source)
+
+    # Assert
+    assert costs == networkx.multi_source_dijkstra(
+        digraph, {source}, weight=lambda _, target, __: 1 if target in blocked else 0)[0]
+    assert component == next(c for c in networkx.strongly_connected_components(digraph) if source in c)
+    assert {node: len(path) for node, path in paths.items()} == {
+        node: length + 1 for node, length in networkx.single_source_shortest_path_length(digraph, source).items()}
+    for node, path in paths.items():
+        assert path[0] == source and path[-1] == node
+        assert all(digraph.has_edge(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_copy_is_independent():
+    # Setup
+    graph, digraph, nodes, _ = _random_graphs(0)
+    source, target, _ = next(graph.edges())
+
+    # Run
+    copy = graph.copy()
+    copy.remove_edge(source, target)
+
+    # Assert
+    assert graph.has_edge(source, target)
+    assert not copy.has_edge(source, target)
+    assert len(copy) == len(graph) == digraph.number_of_nodes()
+    assert list(copy) == list(graph)
+    assert len(list(copy.edges())) == len(list(graph.edges())) - 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_component_matches_recalculation(seed: int):
+    # Setup
+    rng = Random(seed)
+    graph, _, nodes, _ = _random_graphs(seed)
+    root = nodes[0]
+    component = IncrementalComponent(graph, root)
+
+    for _ in range(40):
+        # Run
+        if rng.random() < 0.3:
+            source, target, _ = rng.choice(list(graph.edges()))
+            graph.remove_edge(source, target)
+            component.remove_edge(source, target)
+        else:
+            source, target = rng.choice(nodes), rng.choice(nodes)
+            if not graph.has_edge(source, target):
+                graph.add_edge(source, target, RequirementSet.trivial())
+                component.add_edge(source, target)
+
+        # Assert
+        assert set(component) == graph.strongly_connected_component(root)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_costs_match_recalculation(seed: int):
+    # Setup
+    rng = Random(seed)
+    graph, _, nodes, blocked = _random_graphs(seed)
+    root = nodes[0]
+    blocked.discard(root)
+    costs = IncrementalCosts(graph, root, blocked.__contains__)
+
+    for _ in range(40):
+        # Run
+        if blocked and rng.random() < 0.2:
+            blocked.remove(rng.choice(sorted(blocked)))
+            costs.unblock_nodes(blocked.__contains__)
+        else:
+            source, target = rng.choice(nodes), rng.choice(nodes)
+            if not graph.has_edge(source, target):
+                graph.add_edge(source, target, RequirementSet.trivial())
+                costs.add_edge(source, target, blocked.__contains__)
+
+        # Assert
+        assert {node: costs.get(node) for node in costs} == graph.costs_from(root, blocked.__contains__)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nodes_reaching_matches_networkx(seed: int):
+    # Setup
+    graph, digraph, _, targets = _random_graphs(seed)
+    outside = {node for node in graph.world_list.all_nodes if node not in graph}
+
+    # Run
+    result = graph.nodes_reaching(targets | outside)
+
+    # Assert
+    assert result == targets.union(*(networkx.ancestors(digraph, target) for target in targets))
@@ -0,0 +1,31 @@
+from unittest.mock import MagicMock
+
+from randovania.game_description import data_reader
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.node import is_resource_node
+from randovania.resolver import resolver, debug
+from randovania.resolver.resolver import ResolverStep
+
+
+def test_resolve_with_steps(synthetic_data: dict, synthetic_configuration: MagicMock):
+    # Setup
+    debug._DEBUG_LEVEL = 0
+    game = data_reader.decode_data(synthetic_data)
+    patches = GamePatches.with_game(game).assign_pickup_assignment(game.pickup_database.original_pickup_mapping)
+
+    world_list = game.world_list
+    starting_area = world_list.area_by_asset_id(patches.starting_location.area_asset_id)
+
+    # Run
+    final_state, steps = resolver.resolve_with_steps(synthetic_configuration, game, patches)
+
+    # Assert
+    assert final_state is not None
+    assert final_state.previous_state is None
+    assert steps[0] == ResolverStep(world_list.node_to_ordinal(starting_area.nodes[starting_area.default_node_index]),
+                                    ())
+    assert world_list.node_from_ordinal(steps[-1].node) == final_state.node
+    for step in steps[1:]:
+        node = world_list.node_from_ordinal(step.node)
+        assert is_resource_node(node)
+        assert final_state.has_resource(node.resource())
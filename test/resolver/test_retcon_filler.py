@@ -0,0 +1,77 @@
+import multiprocessing
+import multiprocessing.dummy
+import time
+from random import Random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from randovania.resolver.filler import retcon
+
+
+requires_fork = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+
+
+def _filler_arguments(synthetic_bootstrap):
+    logic, state = synthetic_bootstrap()
+    return logic, state, tuple(sorted(logic.game.pickup_database.pickups.values()))
+
+
+@requires_fork
+def test_weight_workers_serial_outside_main_thread(synthetic_bootstrap):
+    # Setup
+    logic, state, pickups = _filler_arguments(synthetic_bootstrap)
+    serial_patches = retcon.retcon_playthrough_filler(logic, state, pickups, Random(1000), MagicMock())
+
+    # Run
+    with patch.object(retcon, "_WEIGHT_WORKERS", 2), \
+            patch.object(retcon, "_WeightWorkers", side_effect=retcon._WeightWorkers) as weight_workers, \
+            multiprocessing.dummy.Pool(1) as pool:
+        result = pool.apply_async(retcon.retcon_playthrough_filler,
+                                  (logic, state, pickups, Random(1000), MagicMock()))
+        patches = result.get(30)
+
+    # Assert
+    weight_workers.assert_not_called()
+    assert patches.pickup_assignment == serial_patches.pickup_assignment
+
+
+def test_filler_deadline(synthetic_bootstrap):
+    # Setup
+    logic, state, pickups = _filler_arguments(synthetic_bootstrap)
+
+    # Run
+    with pytest.raises(TimeoutError):
+        retcon.retcon_playthrough_filler(logic, state, pickups, Random(1000), MagicMock(), time.monotonic() - 1)
+
+
+@requires_fork
+def test_weight_workers_match_serial(synthetic_bootstrap):
+    # Setup
+    logic, state, pickups = _filler_arguments(synthetic_bootstrap)
+
+    def run(workers: int):
+        weights = []
+        original = retcon._calculate_potential_actions
+
+        def recording(*args):
+            result = original(*args)
+            weights.append(list(result.items()))
+            return result
+
+        with patch.object(retcon, "_WEIGHT_WORKERS", workers), \
+                patch.object(retcon, "_calculate_potential_actions", side_effect=recording), \
+                patch.object(retcon._WeightWorkers, "weights_of_actions", autospec=True,
+                             side_effect=retcon._WeightWorkers.weights_of_actions) as weights_of_actions:
+            patches = retcon.retcon_playthrough_filler(logic, state, pickups, Random(1000), MagicMock())
+        return patches, weights, weights_of_actions.call_count
+
+    # Run
+    serial_patches, serial_weights, serial_calls = run(0)
+    forked_patches, forked_weights, forked_calls = run(3)
+
+    # Assert
+    assert serial_calls == 0
+    assert forked_calls > 1
+    assert forked_weights == serial_weights
+    assert forked_patches.pickup_assignment == serial_patches.pickup_assignment
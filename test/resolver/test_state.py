@@ -0,0 +1,20 @@
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import ResourceDatabase, SimpleResourceInfo, PickupIndex, PickupEntry
+from randovania.resolver.state import State
+
+
+def test_collected_pickup_indices():
+    item = SimpleResourceInfo(0, "Item", "I", ResourceType.ITEM)
+    database = ResourceDatabase([item], [], [], [], [], [], [])
+    patches = GamePatches({}, {}, {}, {}, (), None)
+    pickup = PickupEntry("Pickup", ((item, 1),), "major", 0)
+
+    state = State({PickupIndex(70): 1, item: 1, PickupIndex(3): 1, PickupIndex(5): 0, PickupIndex(6): 1},
+                  None, patches, None, database)
+    state = state.assign_pickup_to_index(PickupIndex(70), pickup)
+
+    assert state.collected_pickup_indices_mask == (1 << 70) | (1 << 3) | (1 << 6)
+    assert state.patches.assigned_pickup_indices_mask == 1 << 70
+    assert list(state.collected_pickup_indices) == [PickupIndex(70), PickupIndex(3), PickupIndex(6)]
+    assert list(state.collected_unassigned_pickup_indices) == [PickupIndex(3), PickupIndex(6)]
@@ -0,0 +1,63 @@
+import argparse
+import gc
+import tracemalloc
+from typing import Tuple
+from unittest.mock import patch
+
+from randovania.cli import prime_database
+from randovania.game_description import data_reader
+from randovania.game_description.game_description import GameDescription
+from randovania.game_description.requirements import RequirementList, RequirementSet
+
+
+def load_game(data: dict, interning: bool) -> Tuple[GameDescription, int]:
+    gc.collect()
+    tracemalloc.start()
+    if interning:
+        game = data_reader.decode_data(data)
+    else:
+        with patch.object(RequirementList, "interned", lambda self: self), \
+             patch.object(RequirementSet, "interned", lambda self: self):
+            game = data_reader.decode_data(data)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return game, size
+
+
+def count_requirements(game: GameDescription) -> Tuple[int, int, int, int]:
+    sets = [
+        requirement_set
+        for area in game.world_list.all_areas
+        for connections in area.connections.values()
+        for requirement_set in connections.values()
+    ]
+    lists = [alternative for requirement_set in sets for alternative in requirement_set.alternatives]
+    return len(sets), len({id(s) for s in sets}), len(lists), len({id(s) for s in lists})
+
+
+def run_report(data: dict):
+    print("{:>10} {:>8} {:>14} {:>8} {:>14} {:>12}".format("interning", "sets", "distinct sets", "lists",
+                                                            "distinct lists", "memory"))
+    sizes = {}
+    for interning in (False, True):
+        game, sizes[interning] = load_game(data, interning)
+        print("{:>10} {:>8} {:>14} {:>8} {:>14} {:>10.1f}KB".format(
+            "on" if interning else "off", *count_requirements(game), sizes[interning] / 1024))
+        del game
+
+    print("Saved {:.1f}KB ({:.1%}) of the loaded GameDescription".format((sizes[False] - sizes[True]) / 1024,
+                                                                      1 - sizes[True] / sizes[False]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports how much memory is saved by sharing identical "
+                                                 "RequirementList and RequirementSet when loading a database.")
+    prime_database.add_data_file_argument(parser)
+    args = parser.parse_args()
+
+    run_report(prime_database.decode_data_file(args))
+
+
+if __name__ == "__main__":
+    main()
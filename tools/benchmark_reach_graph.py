@@ -0,0 +1,125 @@
+import argparse
+import timeit
+from typing import Callable, List, NamedTuple, Set
+
+import networkx
+
+from randovania.cli import prime_database
+from randovania.game_description import data_reader
+from randovania.game_description.node import Node
+from randovania.layout.layout_configuration import LayoutConfiguration
+from randovania.layout.patcher_configuration import PatcherConfiguration
+from randovania.layout.permalink import Permalink
+from randovania.resolver import generator
+from randovania.resolver.generator_reach import GeneratorReach
+from randovania.resolver.reach_graph import ReachGraph
+
+
+class ReachSnapshot(NamedTuple):
+    graph: ReachGraph
+    source: Node
+    blocked: Set[Node]
+
+
+def record_reach_sequence(run: Callable[[], None]) -> List[ReachSnapshot]:
+    """
+    Calls `run`, recording the graph of each GeneratorReach that calculates its reachable nodes.
+    :param run:
+    :return:
+    """
+    snapshots = []
+    original = GeneratorReach._calculate_reachable_paths
+
+    def recording(reach: GeneratorReach):
+        if reach._reachable_costs is None:
+            snapshots.append(ReachSnapshot(reach._digraph.copy(), reach.state.node,
+                                           {node for node in reach._digraph if not reach._can_advance(node)}))
+        original(reach)
+
+    GeneratorReach._calculate_reachable_paths = recording
+    try:
+        run()
+    finally:
+        GeneratorReach._calculate_reachable_paths = original
+
+    return snapshots
+
+
+def _as_networkx(graph: ReachGraph) -> networkx.DiGraph:
+    digraph = networkx.DiGraph()
+    for node in graph:
+        digraph.add_node(node)
+    for source, target, requirements in graph.edges():
+        digraph.add_edge(source, target, requirements=requirements)
+    return digraph
+
+
+def _networkx_component(digraph: networkx.DiGraph, node: Node) -> Set[Node]:
+    for component in networkx.strongly_connected_components(digraph):
+        if node in component:
+            return component
+
+
+def compare_with_networkx(snapshots: List[ReachSnapshot], repeat: int):
+    digraphs = [_as_networkx(snapshot.graph) for snapshot in snapshots]
+
+    def networkx_costs():
+        return [
+            networkx.multi_source_dijkstra(digraph, {snapshot.source},
+                                           weight=lambda source, target, _: 1 if target in snapshot.blocked else 0)[0]
+            for digraph, snapshot in zip(digraphs, snapshots)
+        ]
+
+    def reach_graph_costs():
+        return [snapshot.graph.costs_from(snapshot.source, snapshot.blocked.__contains__) for snapshot in snapshots]
+
+    def networkx_components():
+        return [_networkx_component(digraph, snapshot.source) for digraph, snapshot in zip(digraphs, snapshots)]
+
+    def reach_graph_components():
+        return [snapshot.graph.strongly_connected_component(snapshot.source) for snapshot in snapshots]
+
+    def networkx_copies():
+        return [digraph.copy() for digraph in digraphs]
+
+    def reach_graph_copies():
+        return [snapshot.graph.copy() for snapshot in snapshots]
+
+    if networkx_costs() != reach_graph_costs():
+        raise ValueError("Reachable costs differ from networkx")
+    if networkx_components() != reach_graph_components():
+        raise ValueError("Strongly connected components differ from networkx")
+
+    print("{} reach calculations, {} edges in the largest graph".format(
+        len(snapshots), max((digraph.number_of_edges() for digraph in digraphs), default=0)))
+    print("{:>22} {:>10} {:>12} {:>8}".format("", "networkx", "ReachGraph", "speedup"))
+    for name, reference, new in (("reachable costs", networkx_costs, reach_graph_costs),
+                                 ("safe component", networkx_components, reach_graph_components),
+                                 ("copy", networkx_copies, reach_graph_copies)):
+        reference_time = min(timeit.repeat(reference, number=1, repeat=repeat))
+        new_time = min(timeit.repeat(new, number=1, repeat=repeat))
+        print("{:>22} {:>9.3f}s {:>11.3f}s {:>7.2f}x".format(name, reference_time, new_time,
+                                                            reference_time / new_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the ReachGraph used by GeneratorReach against networkx, "
+                                                 "replaying the reach calculations of generating a seed.")
+    prime_database.add_data_file_argument(parser)
+    parser.add_argument("--seed-number", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    game = data_reader.decode_data(prime_database.decode_data_file(args), False)
+    permalink = Permalink(
+        seed_number=args.seed_number,
+        spoiler=True,
+        patcher_configuration=PatcherConfiguration.default(),
+        layout_configuration=LayoutConfiguration.default(),
+    )
+    snapshots = record_reach_sequence(lambda: generator._create_patches(permalink, game, lambda s: None))
+    compare_with_networkx(snapshots, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
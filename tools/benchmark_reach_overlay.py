@@ -0,0 +1,139 @@
+import argparse
+import copy
+import gc
+import timeit
+import tracemalloc
+from typing import Callable, List, NamedTuple, Tuple
+
+from randovania.cli import prime_database
+from randovania.game_description import data_reader
+from randovania.layout.layout_configuration import LayoutConfiguration
+from randovania.layout.patcher_configuration import PatcherConfiguration
+from randovania.layout.permalink import Permalink
+from randovania.resolver import generator
+from randovania.resolver.filler import retcon
+from randovania.resolver.generator_reach import GeneratorReach, collect_all_safe_resources_in_reach
+from randovania.resolver.state import State
+
+
+class ReachCopies(NamedTuple):
+    base_reach: GeneratorReach
+    states: Tuple[State, ...]
+
+
+def record_reach_copies(run: Callable[[], None]) -> List[ReachCopies]:
+    """
+    Calls `run`, recording a copy of the base reach and the states of each advance_to_with_reach_copies made by the
+    retcon filler.
+    :param run:
+    :return:
+    """
+    recorded = []
+    original = retcon.advance_to_with_reach_copies
+
+    def recording(base_reach: GeneratorReach, states):
+        recorded.append(ReachCopies(copy.deepcopy(base_reach), tuple(states)))
+        return original(base_reach, states)
+
+    retcon.advance_to_with_reach_copies = recording
+    try:
+        run()
+    finally:
+        retcon.advance_to_with_reach_copies = original
+
+    return recorded
+
+
+def _deepcopy(base_reach: GeneratorReach) -> Tuple[GeneratorReach, Callable[[], None]]:
+    return copy.deepcopy(base_reach), lambda: None
+
+
+def _overlay(base_reach: GeneratorReach) -> Tuple[GeneratorReach, Callable[[], None]]:
+    reach = base_reach.overlay()
+    return reach, reach.discard
+
+
+def _advance_copies(recorded: List[ReachCopies],
+                    create: Callable[[GeneratorReach], Tuple[GeneratorReach, Callable[[], None]]],
+                    on_created: Callable[[], None] = lambda: None,
+                    on_advanced: Callable[[], None] = lambda: None,
+                    ):
+    """
+    Advances a copy of each recorded base reach to each of the recorded states.
+    :param recorded:
+    :param create: Creates the copy of the base reach, and a function to call when done with it.
+    :param on_created: Called after each copy is created.
+    :param on_advanced: Called after each copy advanced, before it's done.
+    :return:
+    """
+    for base_reach, states in recorded:
+        for state, satisfied_paths in zip(states, base_reach.satisfied_unreachable_paths(states)):
+            reach, done = create(base_reach)
+            on_created()
+            reach.advance_to(state, satisfied_paths=satisfied_paths)
+            collect_all_safe_resources_in_reach(reach)
+            on_advanced()
+            done()
+
+
+def _measure_memory(recorded: List[ReachCopies],
+                    create: Callable[[GeneratorReach], Tuple[GeneratorReach, Callable[[], None]]],
+                    ) -> Tuple[int, int]:
+    """
+    :param recorded:
+    :param create:
+    :return: The average bytes allocated by each copy after being created, and after advancing.
+    """
+    created = []
+    advanced = []
+
+    def start():
+        gc.collect()
+        tracemalloc.start()
+
+    def on_created():
+        created.append(tracemalloc.get_traced_memory()[0])
+
+    def on_advanced():
+        advanced.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+
+    def create_traced(base_reach: GeneratorReach):
+        start()
+        return create(base_reach)
+
+    _advance_copies(recorded, create_traced, on_created, on_advanced)
+    count = max(len(created), 1)
+    return sum(created) // count, sum(advanced) // count
+
+
+def compare_with_deepcopy(recorded: List[ReachCopies], repeat: int):
+    print("{} base reaches, {} copies".format(len(recorded), sum(len(states) for _, states in recorded)))
+    print("{:>10} {:>10} {:>16} {:>20}".format("", "time", "bytes per copy", "bytes after advance"))
+    for name, create in (("deepcopy", _deepcopy), ("overlay", _overlay)):
+        total_time = min(timeit.repeat(lambda: _advance_copies(recorded, create), number=1, repeat=repeat))
+        created_bytes, advanced_bytes = _measure_memory(recorded, create)
+        print("{:>10} {:>9.3f}s {:>16} {:>20}".format(name, total_time, created_bytes, advanced_bytes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks copying GeneratorReach with deepcopy against overlays, "
+                                                 "replaying the reach copies made while generating a seed.")
+    prime_database.add_data_file_argument(parser)
+    parser.add_argument("--seed-number", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    game = data_reader.decode_data(prime_database.decode_data_file(args), False)
+    permalink = Permalink(
+        seed_number=args.seed_number,
+        spoiler=True,
+        patcher_configuration=PatcherConfiguration.default(),
+        layout_configuration=LayoutConfiguration.default(),
+    )
+    recorded = record_reach_copies(lambda: generator._create_patches(permalink, game, lambda s: None))
+    compare_with_deepcopy(recorded, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import random
+import timeit
+from typing import List
+
+from randovania.cli import prime_database
+from randovania.game_description import data_reader
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.resources import CurrentResources, ResourceDatabase, ResourceArray
+
+
+def read_requirement_sets(data: dict, resource_database: ResourceDatabase) -> List[RequirementSet]:
+    dock_weakness_database = data_reader.read_dock_weakness_database(data["dock_weakness_database"],
+                                                                     resource_database)
+    world_reader = data_reader.WorldReader(resource_database, dock_weakness_database, True)
+    world_list = world_reader.read_world_list(data["worlds"])
+
+    return [
+        requirement_set
+        for area in world_list.all_areas
+        for connections in area.connections.values()
+        for requirement_set in connections.values()
+    ]
+
+
+def random_resources(rng: random.Random, resource_database: ResourceDatabase) -> CurrentResources:
+    resources = {}
+    for resource in resource_database.item + resource_database.event + resource_database.trick:
+        if rng.random() < 0.5:
+            resources[resource] = rng.randint(1, 10)
+    for resource in resource_database.difficulty:
+        resources[resource] = rng.randint(0, 5)
+    return resources
+
+
+def reference_satisfied(requirement_set: RequirementSet, current_resources: CurrentResources,
+                        database: ResourceDatabase) -> bool:
+    return any(
+        all(individual.satisfied(current_resources, database) for individual in alternative.values())
+        for alternative in requirement_set.alternatives
+    )
+
+
+def run_benchmark(data: dict, state_count: int, repeat: int):
+    resource_database = data_reader.read_resource_database(data["resource_database"])
+    requirement_sets = read_requirement_sets(data, resource_database)
+
+    rng = random.Random(5000)
+    states = [random_resources(rng, resource_database) for _ in range(state_count)]
+
+    def reference():
+        return [reference_satisfied(requirement_set, state, resource_database)
+                for state in states
+                for requirement_set in requirement_sets]
+
+    array_states = [ResourceArray(resource_database, state) for state in states]
+
+    def compiled():
+        return [requirement_set.satisfied(state, resource_database)
+                for state in states
+                for requirement_set in requirement_sets]
+
+    def compiled_array():
+        return [requirement_set.satisfied(state, resource_database)
+                for state in array_states
+                for requirement_set in requirement_sets]
+
+    if not (reference() == compiled() == compiled_array()):
+        raise ValueError("Compiled evaluation disagrees with the reference evaluation")
+
+    checks = len(states) * len(requirement_sets)
+    print("{} requirement sets, {} states, {} checks per run".format(len(requirement_sets), len(states), checks))
+    reference_time = min(timeit.repeat(reference, number=1, repeat=repeat))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=repeat))
+    array_time = min(timeit.repeat(compiled_array, number=1, repeat=repeat))
+    for name, elapsed in (("reference", reference_time), ("compiled", compiled_time), ("array", array_time)):
+        print("{:>10}: {:.4f}s ({:.3f} us/check, {:.2f}x)".format(name, elapsed, elapsed * 1e6 / max(checks, 1),
+                                                                  reference_time / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks RequirementSet.satisfied against the "
+                                                 "per-IndividualRequirement evaluation.")
+    prime_database.add_data_file_argument(parser)
+    parser.add_argument("--states", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(prime_database.decode_data_file(args), args.states, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
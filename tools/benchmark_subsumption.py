@@ -0,0 +1,62 @@
+import argparse
+import random
+import timeit
+from typing import List, FrozenSet
+
+from randovania.game_description.requirements import IndividualRequirement, RequirementList, RequirementSet
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import SimpleResourceInfo
+
+
+def create_alternatives(rng: random.Random, count: int, resource_count: int) -> List[RequirementList]:
+    resources = [SimpleResourceInfo(i, "Resource {}".format(i), "R{}".format(i), ResourceType.ITEM)
+                 for i in range(resource_count)]
+    return [
+        RequirementList(0, (IndividualRequirement(resource, 1, False)
+                            for resource in rng.sample(resources, rng.randint(1, 6))))
+        for _ in range(count)
+    ]
+
+
+def reference_remove_dominated(alternatives: List[RequirementList]) -> FrozenSet[RequirementList]:
+    input_set = frozenset(alternatives)
+    return frozenset(
+        requirement
+        for requirement in input_set
+        if not any(other < requirement for other in input_set)
+    )
+
+
+def run_benchmark(sizes: List[int], resource_count: int, repeat: int):
+    rng = random.Random(1000)
+    print("{:>8} {:>8} {:>12} {:>12} {:>8}".format("inputs", "kept", "reference", "index", "speedup"))
+
+    for size in sizes:
+        alternatives = create_alternatives(rng, size, resource_count)
+        expected = reference_remove_dominated(alternatives)
+        result = RequirementSet(alternatives).alternatives
+        if result != expected or list(result) != list(expected):
+            raise ValueError("Different result for {} alternatives".format(size))
+
+        number = max(1, 2000 // size)
+        reference_time = min(timeit.repeat(lambda: reference_remove_dominated(alternatives),
+                                           number=number, repeat=repeat)) / number
+        index_time = min(timeit.repeat(lambda: RequirementSet(alternatives),
+                                       number=number, repeat=repeat)) / number
+        print("{:>8} {:>8} {:>10.3f}ms {:>10.3f}ms {:>7.2f}x".format(
+            size, len(result), reference_time * 1000, index_time * 1000, reference_time / index_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks removing redundant alternatives when creating a "
+                                                 "RequirementSet, using synthetic alternatives.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 4, 10, 100, 1000, 10000])
+    parser.add_argument("--resources", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.resources, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import random
+import statistics
+import timeit
+from typing import Callable, List
+
+from randovania.game_description.requirements import IndividualRequirement, RequirementList, RequirementSet
+from randovania.game_description.resource_type import ResourceType
+from randovania.game_description.resources import SimpleResourceInfo
+
+
+def create_set(rng: random.Random, resources: List[SimpleResourceInfo], count: int,
+               max_size: int) -> RequirementSet:
+    return RequirementSet(
+        RequirementList(0, (IndividualRequirement(resource, 1, False)
+                            for resource in rng.sample(resources, rng.randint(1, max_size))))
+        for _ in range(count)
+    )
+
+
+def reference_union(a: RequirementSet, b: RequirementSet) -> RequirementSet:
+    return RequirementSet(
+        x.union(y)
+        for x in a.alternatives
+        for y in b.alternatives)
+
+
+def median_time(function: Callable[[], object], repeat: int) -> float:
+    """
+    The median time of one call of `function`, over `repeat` runs of enough calls to take at least 0.2 seconds.
+    :param function:
+    :param repeat:
+    :return:
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def run_benchmark(sizes: List[int], resource_count: int, max_size: int, max_alternatives: int, repeat: int):
+    rng = random.Random(2000)
+    resources = [SimpleResourceInfo(i, "Resource {}".format(i), "R{}".format(i), ResourceType.ITEM)
+                 for i in range(resource_count)]
+
+    print("{:>6} {:>6} {:>8} {:>12} {:>12} {:>8}".format("left", "right", "result", "product", "pruned",
+                                                         "speedup"))
+    for size in sizes:
+        a = create_set(rng, resources, size, max_size)
+        b = create_set(rng, resources, size, max_size)
+        expected = reference_union(a, b)
+        result = a.union(b)
+        if result != expected:
+            raise ValueError("Different result for {} alternatives".format(size))
+
+        reference_time = median_time(lambda: reference_union(a, b), repeat)
+        pruned_time = median_time(lambda: a.union(b), repeat)
+        print("{:>6} {:>6} {:>8} {:>10.3f}ms {:>10.3f}ms {:>7.2f}x".format(
+            len(a.alternatives), len(b.alternatives), len(result.alternatives),
+            reference_time * 1000, pruned_time * 1000, reference_time / pruned_time))
+
+        capped = a.union(b, max_alternatives=max_alternatives)
+        if len(capped.alternatives) > max_alternatives or not capped.alternatives <= result.alternatives:
+            raise ValueError("Invalid capped result for {} alternatives".format(size))
+
+    trivial = RequirementSet.trivial()
+    a = create_set(rng, resources, 50, max_size)
+    reference_time = median_time(lambda: reference_union(a, trivial), repeat)
+    pruned_time = median_time(lambda: a.union(trivial), repeat)
+    print("{:>6} {:>6} {:>8} {:>10.3f}ms {:>10.3f}ms {:>7.2f}x".format(
+        len(a.alternatives), "triv", len(a.alternatives),
+        reference_time * 1000, pruned_time * 1000, reference_time / pruned_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks RequirementSet.union against building the full product "
+                                                 "of alternatives, using synthetic rooms with many alternatives.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 10, 50, 100, 200])
+    parser.add_argument("--resources", type=int, default=30)
+    parser.add_argument("--max-size", type=int, default=4)
+    parser.add_argument("--max-alternatives", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.resources, args.max_size, args.max_alternatives, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import collections
+from typing import Callable, Counter, FrozenSet, List
+
+from randovania.cli import prime_database
+from randovania.game_description import data_reader
+from randovania.game_description.game_description import GameDescription
+from randovania.game_description.game_patches import GamePatches
+from randovania.game_description.resources import CurrentResources, PickupEntry, ResourceInfo
+from randovania.layout.layout_configuration import LayoutConfiguration
+from randovania.layout.patcher_configuration import PatcherConfiguration
+from randovania.layout.permalink import Permalink
+from randovania.resolver import generator
+from randovania.resolver.filler import retcon
+
+
+def resources_in_requirements(game: GameDescription) -> FrozenSet[ResourceInfo]:
+    """
+    All resources some connection of the game requires. Amounts of other resources don't change any reach.
+    :param game:
+    :return:
+    """
+    patches = GamePatches.with_game(game)
+    return frozenset(
+        individual.resource
+        for node in game.world_list.all_nodes
+        for _, requirements in game.world_list.potential_nodes_from(node, patches)
+        for alternative in requirements.alternatives
+        for individual in alternative.items
+    )
+
+
+def record_weight_repeats(run: Callable[[], None], relevant: FrozenSet[ResourceInfo]) -> Counter[str]:
+    """
+    Calls `run`, counting how many of the weights calculated by the retcon filler were already calculated for the
+    same action, from a reach with the same node, nodes, uncollected pickups and resources that some connection
+    requires. That's how many times a memo with such a key could be used.
+    :param run:
+    :param relevant:
+    :return: The number of repeats and of new keys.
+    """
+    counts = collections.Counter()
+    seen = set()
+    original = retcon._weights_of_actions
+
+    def relevant_amounts(resources: CurrentResources):
+        return frozenset((resource, amount) for resource, amount in resources.items() if resource in relevant)
+
+    def recording(reach, actions, states, current_uncollected):
+        base_key = (reach.state.node, frozenset(reach.nodes), frozenset(current_uncollected.indices),
+                    frozenset(current_uncollected.resources))
+        for action, state in zip(actions, states):
+            action_key = action.resource_gain() if isinstance(action, PickupEntry) else action
+            key = (base_key, action_key, relevant_amounts(state.resources))
+            counts["repeats" if key in seen else "new"] += 1
+            seen.add(key)
+        return original(reach, actions, states, current_uncollected)
+
+    retcon._weights_of_actions = recording
+    try:
+        run()
+    finally:
+        retcon._weights_of_actions = original
+
+    return counts
+
+
+def report_repeat_rates(counts_by_seed: List[Counter[str]], first_seed: int):
+    print("{:>10} {:>8} {:>8} {:>12}".format("seed", "repeats", "new", "repeat rate"))
+    for seed_number, counts in enumerate(counts_by_seed, first_seed):
+        total = counts["repeats"] + counts["new"]
+        print("{:>10} {:>8} {:>8} {:>11.1%}".format(seed_number, counts["repeats"], counts["new"],
+                                                     counts["repeats"] / total if total else 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports how often the retcon filler calculates a weight it already "
+                                                 "calculated for an equivalent reach, for each generated seed.")
+    prime_database.add_data_file_argument(parser)
+    parser.add_argument("--seed-number", type=int, default=1000)
+    parser.add_argument("--seed-count", type=int, default=5)
+    args = parser.parse_args()
+
+    game = data_reader.decode_data(prime_database.decode_data_file(args), False)
+    relevant = resources_in_requirements(game)
+    counts_by_seed = []
+    for seed_number in range(args.seed_number, args.seed_number + args.seed_count):
+        permalink = Permalink(
+            seed_number=seed_number,
+            spoiler=True,
+            patcher_configuration=PatcherConfiguration.default(),
+            layout_configuration=LayoutConfiguration.default(),
+        )
+        counts_by_seed.append(record_weight_repeats(lambda: generator._create_patches(permalink, game, lambda s: None),
+                                                    relevant))
+
+    report_repeat_rates(counts_by_seed, args.seed_number)
+
+
+if __name__ == "__main__":
+    main()